@@ -0,0 +1,79 @@
+"""
+Benchmark: clipboard backends on a real X display. pyperclip (an xclip/xsel
+process per call) against the xclip backend and the persistent python-xlib
+connection. Needs an X server, so it is not part of run_all.py; run it
+under Xvfb:
+
+    xvfb-run -a python benchmarks/bench_clipboard.py [--repeat 200] [--backends pyperclip xclip xlib]
+"""
+import argparse
+import json
+import time
+
+from harness import summarize
+
+from speak_now.clipboard import TextClipboard, XclipClipboard, XlibClipboard
+
+BACKENDS = {"pyperclip": TextClipboard, "xclip": XclipClipboard, "xlib": XlibClipboard}
+
+
+def bench_backend(clipboard, repeat):
+    """Time each operation a paste needs, plus the whole save/copy/confirm/restore cycle."""
+    timings = {"get_text": [], "set_text": [], "set_and_confirm": [], "paste_cycle": []}
+    for i in range(repeat):
+        text = f"clipboard benchmark {i}"
+
+        start = time.perf_counter()
+        clipboard.set_text(text)
+        timings["set_text"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if clipboard.get_text() != text:
+            raise RuntimeError(f"{clipboard.name} read back something else")
+        timings["get_text"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        clipboard.set_text(text + " again")
+        while clipboard.get_text() != text + " again":
+            if time.perf_counter() - start > 2.0:
+                raise RuntimeError(f"{clipboard.name} never confirmed a write")
+        timings["set_and_confirm"].append(time.perf_counter() - start)
+
+        # What ClipboardPaste does around the keystroke (minus the restore delay)
+        start = time.perf_counter()
+        snapshot = clipboard.capture()
+        clipboard.set_text("pasted text")
+        clipboard.get_text()
+        clipboard.restore(snapshot)
+        timings["paste_cycle"].append(time.perf_counter() - start)
+    return {name: summarize(samples) for name, samples in timings.items()}
+
+
+def run(repeat=200, backends=tuple(BACKENDS)):
+    results = {}
+    for name in backends:
+        try:
+            clipboard = BACKENDS[name]()
+        except Exception as e:
+            results[name] = {"error": str(e)}
+            continue
+        try:
+            results[name] = bench_backend(clipboard, repeat)
+        except Exception as e:
+            results[name] = {"error": str(e)}
+        finally:
+            clipboard.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=list(BACKENDS))
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.repeat, args.backends), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: cold vs warm request latency for a bare requests.post (a new
+connection per call) against the pooled GeminiClient, using a local
+stand-in HTTPS server with a throwaway self-signed certificate.
+
+    python benchmarks/bench_gemini_client.py [--requests 50]
+
+Requires the ``openssl`` binary to generate the certificate.
+"""
+import argparse
+import tempfile
+import time
+
+import requests
+
+from harness import StubGeminiServer, make_certificate, summarize
+from speak_now.gemini_client import GeminiClient
+
+
+def run(count=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(tmp)
+        with StubGeminiServer(certfile=cert, keyfile=key) as stub:
+            url = f"{stub.base_url}/models/stub:generateContent"
+            payload = {"contents": [{"parts": [{"text": "hello world"}]}]}
+
+            bare = []
+            for _ in range(count):
+                start = time.perf_counter()
+                requests.post(url, json=payload, verify=cert, timeout=10).json()
+                bare.append(time.perf_counter() - start)
+
+            client = GeminiClient("stub-key", base_url=stub.base_url, verify=cert)
+            start = time.perf_counter()
+            client.generate("hello world", "stub")
+            cold = time.perf_counter() - start
+            warm = []
+            for _ in range(count):
+                start = time.perf_counter()
+                client.generate("hello world", "stub")
+                warm.append(time.perf_counter() - start)
+            client.close()
+
+    return {"bare": summarize(bare), "cold_ms": cold * 1000, "warm": summarize(warm)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    result = run(args.requests)
+    bare, warm = result["bare"], result["warm"]
+    print(f"bare requests.post (new TLS connection each call): "
+          f"median {bare['median_ms']:7.2f} ms | p95 {bare['p95_ms']:7.2f} ms")
+    print(f"GeminiClient cold (first request):                 {result['cold_ms']:7.2f} ms")
+    print(f"GeminiClient warm (pooled keep-alive):             "
+          f"median {warm['median_ms']:7.2f} ms | p95 {warm['p95_ms']:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: flood EnhancedNotification's message queue with bursts of
+status/content updates and measure enqueue -> render latency and how many
+renders the bursts coalesce into. Needs a display (run under Xvfb on a
+headless machine: ``xvfb-run python benchmarks/bench_gui_queue.py``).
+
+    python benchmarks/bench_gui_queue.py [--bursts 200] [--burst-size 20]
+"""
+import argparse
+import copy
+import statistics
+import threading
+import time
+
+from speak_now.config import DEFAULT_CONFIG
+from speak_now.gui_notification import EnhancedNotification
+
+
+def _percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bursts", type=int, default=200)
+    parser.add_argument("--burst-size", type=int, default=20)
+    parser.add_argument("--gap", type=float, default=0.01, help="Seconds between bursts")
+    args = parser.parse_args()
+
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["ui"]["start_hidden"] = True
+    notification = EnhancedNotification(format_callback=lambda *a: None, config=config)
+    while not notification.running:
+        time.sleep(0.01)
+
+    latencies = []
+    rendered = 0
+    done = threading.Event()
+    total = args.bursts * args.burst_size
+    render = notification._render
+
+    def timed_render(item):
+        nonlocal rendered
+        render(item)
+        rendered += 1
+        latencies.append(time.perf_counter() - item[2])
+        if item[1] == "last":
+            done.set()
+
+    notification._render = timed_render
+
+    start = time.perf_counter()
+    for burst in range(args.bursts):
+        for i in range(args.burst_size):
+            kind = "content" if i % 2 else "status"
+            notification.post(kind, f"{kind} {burst}:{i} " + "word " * 30)
+        time.sleep(args.gap)
+    notification.post("content", "last")
+    done.wait(10)
+    elapsed = time.perf_counter() - start
+    notification.cleanup()
+
+    print(f"posted {total + 1} messages in {elapsed:.2f} s, rendered {rendered} "
+          f"({(total + 1) / max(rendered, 1):.1f} messages per render)")
+    print(f"enqueue -> render latency: median {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p95 {_percentile(latencies, 0.95) * 1000:.2f} ms, max {max(latencies) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
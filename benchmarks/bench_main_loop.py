@@ -0,0 +1,126 @@
+"""
+Benchmark: idle CPU and utterance hand-off latency of the old polling main
+loop (recorder.text() + time.sleep(0.05)) versus the event-driven
+RecorderConsumer, using a fake recorder (no microphone or model needed).
+
+    python benchmarks/bench_main_loop.py [--idle-seconds 3] [--utterances 50]
+"""
+import argparse
+import threading
+import time
+
+from harness import FakeRecorder, summarize
+from speak_now.recorder_consumer import RecorderConsumer
+
+
+class PollingLoop:
+    """The pre-consumer main loop, kept here for comparison."""
+
+    def __init__(self, can_listen, recorder, on_text):
+        self.can_listen = can_listen
+        self.recorder = recorder
+        self.on_text = on_text
+        self.stopping = False
+
+    def run(self):
+        while not self.stopping:
+            if self.can_listen():
+                self.recorder.text(self.on_text)
+            time.sleep(0.05)
+
+
+def _cpu_while_idle(start_loop, stop_loop, seconds):
+    # The main thread only sleeps, so process CPU time is the loop's CPU time
+    start = time.process_time()
+    start_loop()
+    time.sleep(seconds)
+    used = time.process_time() - start
+    stop_loop()
+    return used / seconds * 100  # percent of one core
+
+
+def _handoff_latency(make_loop, count, gap):
+    recorder = FakeRecorder()
+    said_at = {}
+    latencies = []
+    done = threading.Event()
+
+    def on_text(text):
+        latencies.append(time.perf_counter() - said_at[text])
+        if len(latencies) == count:
+            done.set()
+
+    stop = make_loop(recorder, on_text)
+    for i in range(count):
+        text = f"utterance {i}"
+        said_at[text] = time.perf_counter()
+        recorder.say(text)
+        time.sleep(gap)
+    done.wait(30)
+    stop(recorder)
+    return latencies
+
+
+def run(idle_seconds=3.0, utterances=50, gap=0.03):
+    # --- Idle CPU while muted ---
+    polling = PollingLoop(lambda: False, FakeRecorder(), print)
+    polling_thread = threading.Thread(target=polling.run, daemon=True)
+
+    def stop_polling():
+        polling.stopping = True
+
+    polling_cpu = _cpu_while_idle(polling_thread.start, stop_polling, idle_seconds)
+
+    consumer = RecorderConsumer(lambda: False, FakeRecorder, print)
+    consumer_cpu = _cpu_while_idle(consumer.start, consumer.stop, idle_seconds)
+
+    # --- Hand-off latency while listening ---
+    def make_polling(recorder, on_text):
+        loop = PollingLoop(lambda: True, recorder, on_text)
+        threading.Thread(target=loop.run, daemon=True).start()
+
+        def stop(rec):
+            loop.stopping = True
+            rec.abort()
+
+        return stop
+
+    def make_consumer(recorder, on_text):
+        loop = RecorderConsumer(lambda: True, lambda: recorder, on_text)
+        loop.start()
+
+        def stop(rec):
+            loop.stop(timeout=0)
+            rec.abort()
+
+        return stop
+
+    return {
+        "polling": {
+            "idle_cpu_percent": polling_cpu,
+            "handoff": summarize(_handoff_latency(make_polling, utterances, gap)),
+        },
+        "consumer": {
+            "idle_cpu_percent": consumer_cpu,
+            "handoff": summarize(_handoff_latency(make_consumer, utterances, gap)),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    parser.add_argument("--utterances", type=int, default=50)
+    parser.add_argument("--gap", type=float, default=0.03, help="Seconds between utterances")
+    args = parser.parse_args()
+
+    result = run(args.idle_seconds, args.utterances, args.gap)
+    print(f"{'':<22}{'idle CPU (muted)':>18}{'median hand-off':>18}{'max hand-off':>15}")
+    for name, key in (("polling main loop", "polling"), ("RecorderConsumer", "consumer")):
+        entry = result[key]
+        print(f"{name:<22}{entry['idle_cpu_percent']:>17.3f}%"
+              f"{entry['handoff']['median_ms']:>15.2f} ms{entry['handoff']['max_ms']:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: per-cue latency of synthesizing on every call versus a
+pre-rendered SoundBank lookup. Nothing is played (PyAudio is replaced by a
+no-op backend); only buffer preparation is timed.
+
+    python benchmarks/bench_sound_bank.py [--repeat 200]
+"""
+import argparse
+import tempfile
+import time
+
+from harness import install_headless_backends
+
+install_headless_backends()
+
+from speak_now.sound import SOUND_CUES, MinimalSoundEngine, SoundBank  # noqa: E402
+
+
+def _time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6  # microseconds
+
+
+def run(repeat=200, volume=0.5):
+    sound_engine = MinimalSoundEngine()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Populate the on-disk cache once, then measure a fresh bank loading it
+        SoundBank(sound_engine, cache_dir=cache_dir).prerender(volume)
+        disk_bank = SoundBank(sound_engine, cache_dir=cache_dir)
+        start = time.perf_counter()
+        disk_bank.prerender(volume)
+        disk_ms = (time.perf_counter() - start) * 1000
+
+    bank = SoundBank(sound_engine)
+    start = time.perf_counter()
+    bank.prerender(volume)
+    render_ms = (time.perf_counter() - start) * 1000
+
+    cues = {}
+    for name in SOUND_CUES:
+        cues[name] = {
+            "synth_us": _time_per_call(lambda: bank.render(name, volume), repeat),
+            "bank_us": _time_per_call(lambda: bank.get(name, volume), repeat),
+        }
+    return {"render_all_ms": render_ms, "load_from_disk_ms": disk_ms, "cues": cues}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--volume", type=float, default=0.5)
+    args = parser.parse_args()
+
+    result = run(args.repeat, args.volume)
+    print(f"Startup: render all cues {result['render_all_ms']:.2f} ms, "
+          f"load from disk cache {result['load_from_disk_ms']:.2f} ms\n")
+    print(f"{'cue':<18}{'synth (us)':>14}{'bank (us)':>14}{'speedup':>10}")
+    for name, cue in result["cues"].items():
+        before, after = cue["synth_us"], cue["bank_us"]
+        print(f"{name:<18}{before:>14.1f}{after:>14.2f}{before / after:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
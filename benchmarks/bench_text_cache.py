@@ -0,0 +1,143 @@
+"""
+Benchmark: TextCache throughput, hotkey-to-paste latency and formatting
+overhead, fully headless (fake recorder, no-op clipboard/keyboard/sound,
+headless notification, local Gemini stand-in).
+
+    python benchmarks/bench_text_cache.py [--utterances 2000] [--pastes 50] [--latency 0.2]
+"""
+import argparse
+import json
+import threading
+import time
+
+from harness import (
+    FakeRecorder,
+    StubGeminiServer,
+    backends,
+    headless_config,
+    headless_notification_class,
+    install_headless_backends,
+    quiet,
+    summarize,
+)
+
+install_headless_backends()
+
+from speak_now.hotkey_manager import HotkeyManager  # noqa: E402
+from speak_now.recorder_consumer import RecorderConsumer  # noqa: E402
+from speak_now.text_cache import TextCache  # noqa: E402
+
+
+def _text_cache(config):
+    return TextCache(config, notification_class=headless_notification_class())
+
+
+def bench_throughput(utterances, rate):
+    """Utterances per second through FakeRecorder -> RecorderConsumer -> add_text."""
+    text_cache = _text_cache(headless_config())
+    recorder = FakeRecorder()
+    durations = []
+    done = threading.Event()
+
+    def on_text(text):
+        start = time.perf_counter()
+        text_cache.add_text(text)
+        durations.append(time.perf_counter() - start)
+        if len(durations) == utterances:
+            done.set()
+
+    consumer = RecorderConsumer(lambda: True, lambda: recorder, on_text)
+    consumer.start()
+    with quiet():
+        start = time.perf_counter()
+        recorder.replay([f"utterance number {i} with a few words" for i in range(utterances)], rate)
+        done.wait(60)
+        elapsed = time.perf_counter() - start
+        consumer.stop(timeout=0)
+        recorder.abort()
+        text_cache.cleanup()
+
+    return {
+        "utterances": len(durations),
+        "rate": rate,
+        "utterances_per_second": len(durations) / elapsed,
+        "add_text": summarize(durations),
+    }
+
+
+def bench_hotkey_to_paste(pastes):
+    """Raw-paste hotkey handler to Ctrl+V keystroke, and until the handler returns."""
+    text_cache = _text_cache(headless_config())
+    hotkeys = HotkeyManager(text_cache.config, text_cache)
+    to_keystroke, to_return = [], []
+
+    with quiet():
+        for i in range(pastes):
+            text_cache.add_text(f"paste number {i}")
+            sent = len(backends.keystrokes)
+            start = time.perf_counter()
+            hotkeys._on_paste_raw_hotkey()
+            end = time.perf_counter()
+            keystrokes = backends.keystrokes[sent:]
+            if keystrokes:
+                to_keystroke.append(keystrokes[0][0] - start)
+            to_return.append(end - start)
+        text_cache.cleanup()
+
+    return {
+        "pastes": pastes,
+        "hotkey_to_keystroke": summarize(to_keystroke),
+        "hotkey_to_return": summarize(to_return),
+    }
+
+
+def bench_formatting_overhead(pastes, latency, streaming):
+    """Format-and-paste end to end against a stub with `latency` seconds of model time."""
+    with StubGeminiServer(latency=latency) as stub:
+        config = headless_config(
+            api={"gemini_api_key": "stub-key", "base_url": stub.base_url},
+            formatting={"streaming": streaming},
+        )
+        text_cache = _text_cache(config)
+        totals = []
+        with quiet():
+            for i in range(pastes):
+                # Unique text each round so the format cache never answers
+                text_cache.add_text(f"format request {i} {time.perf_counter()}")
+                start = time.perf_counter()
+                job = text_cache.format_and_paste()
+                job.future.result(timeout=30)
+                totals.append(time.perf_counter() - start)
+            text_cache.cleanup()
+
+    result = {"pastes": pastes, "stub_latency_ms": latency * 1000, "streaming": streaming}
+    result["end_to_end"] = summarize(totals)
+    result["overhead"] = summarize([total - latency for total in totals])
+    return result
+
+
+def run(utterances=2000, rate=0.0, pastes=50, latency=0.2):
+    return {
+        "throughput": bench_throughput(utterances, rate),
+        "hotkey_to_paste": bench_hotkey_to_paste(pastes),
+        "formatting": [
+            bench_formatting_overhead(pastes, latency, streaming=False),
+            bench_formatting_overhead(pastes, latency, streaming=True),
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Utterances per second from the fake recorder (0 = unthrottled)")
+    parser.add_argument("--pastes", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub Gemini latency in seconds")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.utterances, args.rate, args.pastes, args.latency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Headless stand-ins shared by the benchmarks, so the suite runs without a
+microphone, display, network or real keystrokes:
+
+- install_headless_backends(): no-op pyperclip / keyboard / pyautogui /
+  pyaudio modules. Call it before importing anything from speak_now.
+- FakeRecorder: an AudioToTextRecorder that replays text at a chosen rate.
+- StubGeminiServer: a local HTTP(S) Gemini stand-in with configurable latency.
+- HeadlessNotification: EnhancedNotification without Tk.
+"""
+import json
+import os
+import queue
+import ssl
+import subprocess
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ---------------------------------------------------------------------
+# NO-OP BACKENDS
+# ---------------------------------------------------------------------
+class NullBackends:
+    """What the no-op backends were asked to do, for benchmarks to inspect."""
+
+    def __init__(self):
+        self.clipboard = ""
+        self.keystrokes = []  # (perf_counter, keys)
+        self.lock = threading.Lock()
+
+    def keystroke(self, keys):
+        with self.lock:
+            self.keystrokes.append((time.perf_counter(), keys))
+
+
+backends = NullBackends()
+
+
+class _NullStream:
+    def __init__(self, stream_callback=None, frames_per_buffer=1024, **kwargs):
+        self.active = False
+        self.callback = stream_callback
+        self.frames = frames_per_buffer
+
+    def feed(self, count=1):
+        """Deliver `count` buffers of silence to a callback stream, like a microphone would."""
+        for _ in range(count):
+            self.callback(b"\0\0" * self.frames, self.frames, {}, 0)
+
+    def start_stream(self):
+        self.active = True
+
+    def stop_stream(self):
+        self.active = False
+
+    def is_active(self):
+        return self.active
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        self.active = False
+
+
+class _NullPyAudio:
+    def open(self, **kwargs):
+        return _NullStream(**kwargs)
+
+    def terminate(self):
+        pass
+
+
+def install_headless_backends():
+    """Register no-op clipboard, keystroke and sound modules in sys.modules."""
+    pyperclip = types.ModuleType("pyperclip")
+    pyperclip.copy = lambda text: setattr(backends, "clipboard", str(text))
+    pyperclip.paste = lambda: backends.clipboard
+
+    keyboard = types.ModuleType("keyboard")
+    keyboard.press_and_release = backends.keystroke
+    keyboard.send = backends.keystroke
+    keyboard.write = lambda text, delay=0: backends.keystroke(("write", text))
+    keyboard.press = keyboard.release = lambda keys: None
+    keyboard.add_hotkey = lambda hotkey, callback, *args, **kwargs: hotkey
+    keyboard.remove_hotkey = keyboard.unhook_all = lambda *args: None
+
+    pyautogui = types.ModuleType("pyautogui")
+    pyautogui.hotkey = lambda *keys, **kwargs: backends.keystroke("+".join(keys))
+    pyautogui.press = pyautogui.keyDown = pyautogui.keyUp = lambda *args, **kwargs: None
+    pyautogui.write = pyautogui.typewrite = lambda text, *args, **kwargs: backends.keystroke(
+        ("write", text)
+    )
+
+    pyaudio = types.ModuleType("pyaudio")
+    pyaudio.paInt16 = 8
+    pyaudio.paContinue = 0
+    pyaudio.PyAudio = _NullPyAudio
+
+    # Always replace the real modules: a benchmark must never type into a real window
+    sys.modules.update(
+        pyperclip=pyperclip, keyboard=keyboard, pyautogui=pyautogui, pyaudio=pyaudio
+    )
+
+
+def headless_config(**sections):
+    """Default config (without reading or writing stt_config.toml), with overrides per section."""
+    import copy
+
+    from speak_now.config import DEFAULT_CONFIG
+
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["metrics"]["enabled"] = False
+    config["history"]["archive"] = False
+    config["format_cache"]["persist"] = False
+    config["paste"]["persist"] = False
+    for section, values in sections.items():
+        config.setdefault(section, {}).update(values)
+    return config
+
+
+# ---------------------------------------------------------------------
+# FAKE RECORDER
+# ---------------------------------------------------------------------
+class FakeRecorder:
+    """
+    AudioToTextRecorder stand-in. text() returns the next queued utterance and
+    blocks while none are queued; replay() queues utterances at a fixed rate.
+    """
+
+    def __init__(self, on_recording_stop=None, **options):
+        self.options = options
+        self.on_recording_stop = on_recording_stop
+        self.utterances = queue.Queue()
+        self.microphone = True
+        self.timeout = None
+        self.fed = []  # (chunk, sample rate) passed to feed_audio()
+
+    def say(self, text):
+        if self.on_recording_stop:
+            self.on_recording_stop()
+        self.utterances.put((time.perf_counter(), text))
+
+    def replay(self, texts, rate):
+        """Queue `texts` at `rate` utterances per second (0 = as fast as possible) on a thread."""
+
+        def run():
+            interval = 1.0 / rate if rate else 0.0
+            next_at = time.perf_counter()
+            for text in texts:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self.say(text)
+                next_at += interval
+
+        thread = threading.Thread(target=run, name="fake-recorder", daemon=True)
+        thread.start()
+        return thread
+
+    def text(self, on_transcription_finished=None):
+        item = self.utterances.get()
+        if item is None:
+            return ""
+        if on_transcription_finished:
+            on_transcription_finished(item[1])
+            return None
+        return item[1]
+
+    def feed_audio(self, chunk, original_sample_rate=16000):
+        # Like RealtimeSTT, which only resamples numpy arrays and appends bytes as 16 kHz
+        if isinstance(chunk, (bytes, bytearray)) and original_sample_rate != 16000:
+            raise ValueError(f"bytes at {original_sample_rate} Hz would be fed as 16 kHz audio")
+        self.fed.append((chunk, original_sample_rate))
+
+    def set_microphone(self, microphone_on=True):
+        self.microphone = microphone_on
+
+    def abort(self):
+        self.utterances.put(None)
+
+    def shutdown(self):
+        self.utterances.put(None)
+
+
+# ---------------------------------------------------------------------
+# STUB GEMINI SERVER
+# ---------------------------------------------------------------------
+class _StubGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        # GeminiClient.warm_up() only needs the connection
+        self._send(200, "application/json", b"{}")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        stub = self.server.stub
+        stub.requests += 1
+
+        status = stub.next_status()
+        if status != 200:
+            time.sleep(stub.latency)
+            self._send(status, "application/json", b'{"error": "stub failure"}')
+            return
+
+        prompt = request["contents"][0]["parts"][0]["text"]
+        chunks = stub.respond(prompt)
+        time.sleep(stub.latency)
+
+        if ":streamGenerateContent" in self.path:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for index, chunk in enumerate(chunks):
+                if index:
+                    time.sleep(stub.chunk_delay)
+                event = {"candidates": [{"content": {"parts": [{"text": chunk}]}}]}
+                self._write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            self._write_chunk(b"")
+        else:
+            time.sleep(stub.chunk_delay * max(len(chunks) - 1, 0))
+            body = {"candidates": [{"content": {"parts": [{"text": "".join(chunks)}]}}]}
+            self._send(200, "application/json", json.dumps(body).encode("utf-8"))
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (deadlines, abandoned hedges) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubGeminiServer:
+    """
+    Local Gemini stand-in serving generateContent and SSE streamGenerateContent.
+
+    Every response echoes the prompt back in `chunk_words`-word chunks after
+    `latency` seconds, with `chunk_delay` seconds between chunks. Pass a
+    certificate and key to serve HTTPS instead of plain HTTP.
+    """
+
+    def __init__(self, latency=0.0, chunk_delay=0.0, chunk_words=4, certfile=None, keyfile=None):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunk_words = chunk_words
+        self.requests = 0
+        self._failures = []
+        self._failures_lock = threading.Lock()
+
+        self.server = _QuietHTTPServer(("localhost", 0), _StubGeminiHandler)
+        self.server.stub = self
+        scheme = "http"
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+            scheme = "https"
+        self.base_url = f"{scheme}://localhost:{self.server.server_address[1]}/v1beta"
+        self._thread = None
+
+    def fail_next(self, status, count=1):
+        """Answer the next `count` requests with an HTTP error status."""
+        with self._failures_lock:
+            self._failures.extend([status] * count)
+
+    def next_status(self):
+        with self._failures_lock:
+            return self._failures.pop(0) if self._failures else 200
+
+    def respond(self, prompt):
+        words = prompt.split(" ")
+        return [
+            " ".join(words[i:i + self.chunk_words]) + (" " if i + self.chunk_words < len(words) else "")
+            for i in range(0, len(words), self.chunk_words)
+        ]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def make_certificate(directory):
+    """Throwaway self-signed certificate for localhost (needs the openssl binary)."""
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+         "-keyout", key, "-out", cert],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+# ---------------------------------------------------------------------
+# HEADLESS NOTIFICATION
+# ---------------------------------------------------------------------
+def headless_notification_class():
+    """EnhancedNotification subclass that renders into attributes instead of Tk widgets."""
+    from speak_now.gui_notification import EnhancedNotification
+    from speak_now.metrics import metrics
+
+    class HeadlessNotification(EnhancedNotification):
+        def _start_gui(self):
+            self.rendered = 0
+            self.status_text = ""
+            self.preview_text = ""
+            self.style_previews = {}  # style -> previewed text (None until it arrives)
+            self._wake_event = threading.Event()
+            self.running = True
+            self.thread = threading.Thread(target=self._drain_loop, name="headless-gui", daemon=True)
+            self.thread.start()
+
+        def _wake(self):
+            self._wake_event.set()
+
+        def _drain_loop(self):
+            while self.running:
+                self._wake_event.wait()
+                self._wake_event.clear()
+                for item in self._coalesce(self._drain_queue()):
+                    self._render(item)
+
+        def _render(self, item):
+            message_type, message = item[0], item[1]
+            metrics.record("gui_enqueue_to_render", time.perf_counter() - item[2])
+            self.rendered += 1
+            if message_type in ("content", "format_partial", "format_result"):
+                self.current_text = message
+                self.showing_cache = message_type == "content"
+            elif message_type == "status":
+                self.status_text = message
+            elif message_type == "partial":
+                self.preview_text = message
+            elif message_type == "add_history":
+                self.history_store.add(message)
+            elif message_type == "preview_start":
+                self.style_previews = dict.fromkeys(message)
+            elif message_type == "preview_result":
+                self.style_previews[message[0]] = message[1]
+
+        def get_current_format(self):
+            return self.config["ui"]["default_format"]
+
+        def cleanup(self):
+            self.running = False
+            self._wake_event.set()
+            self.history_store.close()
+
+    return HeadlessNotification
+
+
+# ---------------------------------------------------------------------
+# SUMMARIES
+# ---------------------------------------------------------------------
+def summarize(samples):
+    """Millisecond summary of a list of durations in seconds."""
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "median_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def quiet():
+    """Silence the app's console logging while a benchmark runs."""
+    import contextlib
+
+    return contextlib.redirect_stdout(open(os.devnull, "w"))
@@ -0,0 +1,76 @@
+"""
+Run the headless benchmark suite and write machine-readable results.
+
+Needs no microphone, display or network: recorder, clipboard, keyboard,
+sound and the Gemini API are replaced by the stand-ins in harness.py.
+
+    python benchmarks/run_all.py [--output bench_results.json] [--quick] [--only text_cache ...]
+
+bench_gui_queue.py needs a real Tk display and bench_clipboard.py an X server
+(run it under xvfb-run); neither is part of the suite.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from harness import install_headless_backends
+
+install_headless_backends()
+
+import bench_gemini_client  # noqa: E402
+import bench_main_loop  # noqa: E402
+import bench_sound_bank  # noqa: E402
+import bench_text_cache  # noqa: E402
+
+# name -> (run function, full-size kwargs, quick kwargs)
+SUITE = {
+    "sound_bank": (bench_sound_bank.run, {"repeat": 200}, {"repeat": 20}),
+    "gemini_client": (bench_gemini_client.run, {"count": 50}, {"count": 10}),
+    "main_loop": (
+        bench_main_loop.run,
+        {"idle_seconds": 3.0, "utterances": 50},
+        {"idle_seconds": 0.5, "utterances": 10},
+    ),
+    "text_cache": (
+        bench_text_cache.run,
+        {"utterances": 2000, "pastes": 50},
+        {"utterances": 200, "pastes": 10},
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="bench_results.json", help="JSON file to write")
+    parser.add_argument("--quick", action="store_true", help="Smaller sample sizes for a smoke run")
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITE), help="Run only these benchmarks")
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "benchmarks": {},
+    }
+    for name in args.only or SUITE:
+        run, full, quick = SUITE[name]
+        print(f"[bench] {name} ...", flush=True)
+        start = time.perf_counter()
+        try:
+            results["benchmarks"][name] = run(**(quick if args.quick else full))
+        except Exception as e:
+            # Keep going so one missing tool (e.g. openssl) doesn't lose the other results
+            print(f"[bench] {name} failed: {e}")
+            results["benchmarks"][name] = {"error": str(e)}
+        print(f"[bench] {name} done in {time.perf_counter() - start:.1f} s")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[bench] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
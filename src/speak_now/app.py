@@ -1,27 +1,76 @@
 import time
+import threading
+from contextlib import nullcontext
 
 from speak_now.config import load_config
-from speak_now.utils import generate_gemini, play_sound, cleanup_audio
-from speak_now.gui_notification import EnhancedNotification
+from speak_now.utils import play_sound, cleanup_audio, prerender_sounds
 from speak_now.text_cache import TextCache
 from speak_now.hotkey_manager import HotkeyManager
+from speak_now.recorder_consumer import RecorderConsumer
+from speak_now.audio_prebuffer import MicPrebuffer
+from speak_now.metrics import metrics, metrics_path
+
+
+# What toggling recording off does with the recorder
+MUTE_MODES = ("fast_resume", "release_mic")
 
 
 # ---------------------------------------------------------------------
 # MAIN APPLICATION CLASS
 # ---------------------------------------------------------------------
 class SpeechTranscriptionApp:
-    def __init__(self, config_file="stt_config.toml"):
+    def __init__(self, config_file="stt_config.toml", profiler=None):
+        self.profiler = profiler  # StartupProfiler with --profile-startup
+
         # Load configuration
-        self.config = load_config(config_file)
+        with self._phase("load config"):
+            self.config = load_config(config_file)
+
+        # Render feedback sounds (NumPy, PyAudio, output stream) off the startup path so
+        # playback is a buffer lookup by the time it's needed
+        self._sound_thread = threading.Thread(
+            target=self._warm_up_sounds, name="sound-warmup", daemon=True
+        )
+        self._sound_thread.start()
+
+        if self.config["metrics"].get("enabled", True):
+            metrics.start_reporter(
+                metrics_path(self.config), self.config["metrics"].get("interval", 60.0)
+            )
 
         # Initialize components
-        self.text_cache = TextCache(self.config)
-        self.hotkey_manager = HotkeyManager(self.config, self.text_cache)
+        with self._phase("text cache + GUI"):
+            self.text_cache = TextCache(self.config)
+        with self._phase("hotkey manager"):
+            self.hotkey_manager = HotkeyManager(self.config, self.text_cache)
         self.recorder = None
         self.recorder_active = True  # Track if recorder is currently active
         self.recorder_initialized = False  # Track if recorder has been initialized
+        self.model_loading = False  # STT model is loading on a background thread
+        self._model_thread = None
+        self._prebuffer = None  # Records the microphone while the model loads
+        self._stop_requested = threading.Event()
+
+        # Blocks on the recorder while listening, sleeps on a condition while muted
+        self.consumer = RecorderConsumer(
+            can_listen=self._can_listen,
+            get_recorder=lambda: self.recorder,
+            on_text=self.text_cache.add_text,
+        )
+
+        # "fast_resume" keeps the model loaded while muted; "release_mic" frees everything
+        self.mute_mode = self.config["stt"].get("mute_mode", "fast_resume")
+        if self.mute_mode not in MUTE_MODES:
+            print(f"[Main] Unknown stt.mute_mode '{self.mute_mode}', using 'fast_resume'")
+            self.mute_mode = "fast_resume"
 
+    def _phase(self, name):
+        """Time a startup phase when profiling, otherwise do nothing."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    def _warm_up_sounds(self):
+        with self._phase("sound bank (background)"):
+            prerender_sounds()
 
     def start(self):
         """Start the application."""
@@ -34,6 +83,13 @@ class SpeechTranscriptionApp:
         # Add new toggle window hotkey to the output
         if "toggle_window" in self.config["hotkeys"]:
             print(f"Toggle window: {self.config['hotkeys']['toggle_window']}")
+        if "cancel_format" in self.config["hotkeys"]:
+            print(f"Cancel format: {self.config['hotkeys']['cancel_format']}")
+        if "preview_all" in self.config["hotkeys"]:
+            print(f"Preview all styles: {self.config['hotkeys']['preview_all']}")
+            pick = self.config["hotkeys"].get("preview_pick")
+            if pick:
+                print(f"Paste previewed style: {pick.replace('{n}', 'N')} (while a preview is open)")
         
         print("Use the GUI window to select formatting style and view history.")
         
@@ -45,7 +101,9 @@ class SpeechTranscriptionApp:
         print("Press Ctrl+C in terminal to exit.\n")
 
         # Register hotkeys
-        if not self.hotkey_manager.register_hotkeys():
+        with self._phase("register hotkeys"):
+            registered = self.hotkey_manager.register_hotkeys()
+        if not registered:
             print("[ERROR] Failed to register hotkeys. Try restarting the application.")
             print(
                 "If the problem persists, check if another application is using the same hotkeys."
@@ -53,36 +111,33 @@ class SpeechTranscriptionApp:
             return False
 
         try:
-            # Import STT library here to handle import errors gracefully
-            from RealtimeSTT import AudioToTextRecorder
+            # Set app reference in notification for microphone control
+            self.text_cache.notification.set_app_reference(self)
+
+            # Set recorder reference in hotkey manager
+            self.hotkey_manager.set_recorder(self)
 
-            # Store the recorder class for later initialization
-            self.RecorderClass = AudioToTextRecorder
-            
-            # Initialize the recorder only if needed (not starting in muted state)
+            # Load the model only if needed (not starting in muted state). It loads in
+            # the background so the window and hotkeys are usable right away
             if self.text_cache.notification.is_recording_enabled():
-                self._initialize_recorder()
+                self._start_model_load()
             else:
                 # If we're starting in a muted state, don't initialize the recorder yet
                 print("[Main] Starting with recording disabled - microphone not initialized")
                 self.recorder_active = False
+                play_sound("startup")
 
-            # Set app reference in notification for microphone control
-            self.text_cache.notification.set_app_reference(self)
-
-            # Set recorder reference in hotkey manager
-            self.hotkey_manager.set_recorder(self)
-
-            # Play startup sound
-            play_sound("startup")
+            if self.profiler:
+                # Profiling only measures startup; report and exit instead of listening
+                self._sound_thread.join()
+                if self._model_thread is not None:
+                    self._model_thread.join()
+                self.profiler.report()
+                return True
 
             # Start the main loop
             self._run_main_loop()
 
-        except ImportError as e:
-            print(f"[ERROR] Could not import RealtimeSTT: {e}")
-            print("Please make sure the library is installed (pip install RealtimeSTT)")
-            return False
         except Exception as e:
             print(f"[ERROR] Failed to start application: {e}")
             return False
@@ -91,14 +146,111 @@ class SpeechTranscriptionApp:
 
         return True
 
+    def _start_model_load(self):
+        """Load the STT model on a background thread, buffering the microphone meanwhile."""
+        self.model_loading = True
+        self.recorder_active = True
+        if self.config["stt"].get("prebuffer", True):
+            prebuffer = MicPrebuffer(self.config["stt"].get("prebuffer_max_seconds", 30.0))
+            self._prebuffer = prebuffer if prebuffer.start() else None
+
+        buffering = " (recording meanwhile)" if self._prebuffer else ""
+        print(f"[Main] Loading speech model in the background{buffering}")
+        self.text_cache.notification.update_status(f"Loading speech model...{buffering}")
+        self._model_thread = threading.Thread(
+            target=self._load_model, name="stt-model-load", daemon=True
+        )
+        self._model_thread.start()
+
+    def _load_model(self):
+        """Background half of _start_model_load(): create the recorder, then replay the buffer."""
+        start = time.perf_counter()
+        try:
+            with self._phase("load STT model (background)"):
+                # Import STT library here to handle import errors gracefully
+                from RealtimeSTT import AudioToTextRecorder
+
+                # Store the recorder class for later initialization
+                self.RecorderClass = AudioToTextRecorder
+                self._initialize_recorder()
+        except ImportError as e:
+            self._model_load_failed()
+            print(f"[ERROR] Could not import RealtimeSTT: {e}")
+            print("Please make sure the library is installed (pip install RealtimeSTT)")
+            self.request_shutdown()
+            return
+        except Exception as e:
+            self._model_load_failed()
+            print(f"[ERROR] Failed to load the speech model: {e}")
+            self.request_shutdown()
+            return
+
+        if self._stop_requested.is_set():
+            return  # Shut down while loading; cleanup() releases the recorder
+
+        prebuffer, self._prebuffer = self._prebuffer, None
+        wanted = self.text_cache.notification.is_recording_enabled()
+        if prebuffer is not None:
+            # Hold live input back until the buffered audio is queued, or the two would interleave
+            self.recorder.set_microphone(False)
+            chunks = prebuffer.stop()
+            if wanted:
+                import numpy as np
+
+                for chunk in chunks:
+                    # Raw bytes are taken as 16 kHz as they are; an array is resampled from its rate
+                    samples = np.frombuffer(chunk, dtype=np.int16)
+                    self.recorder.feed_audio(samples, original_sample_rate=prebuffer.sample_rate)
+                print(f"[Main] Transcribing {prebuffer.seconds(chunks):.1f} s recorded while loading")
+                self.recorder.set_microphone(True)
+
+        self.model_loading = False
+        print(f"[Main] Speech model ready after {time.perf_counter() - start:.1f} s")
+        self.text_cache.notification.update_status("Speech model ready")
+        if wanted:
+            play_sound("startup")
+        else:
+            # Muted while the model was loading
+            self.recorder_active = True
+            self.toggle_microphone(False)
+
+    def _model_load_failed(self):
+        self.model_loading = False
+        self.recorder_active = False
+        if self._prebuffer is not None:
+            self._prebuffer.stop()
+            self._prebuffer = None
+        self.text_cache.notification.update_status("Speech model failed to load")
+        play_sound("error")
+
     def _initialize_recorder(self):
         """Initialize the audio recorder if not already initialized."""
         if not self.recorder_initialized:
-            self.recorder = self.RecorderClass(model=self.config["stt"]["model"])
+            self.recorder = self.RecorderClass(**self._recorder_options())
             self.recorder.timeout = self.config["stt"]["timeout"]
             self.recorder_initialized = True
             print("[Main] Initialized microphone recorder")
         self.recorder_active = True
+        self.consumer.notify()
+
+    def _recorder_options(self):
+        """Keyword arguments for AudioToTextRecorder built from the [stt] section."""
+        stt = self.config["stt"]
+        options = {
+            "model": stt["model"],
+            # Starts the "end of speech -> text in cache" latency span
+            "on_recording_stop": lambda: metrics.mark("speech_end"),
+        }
+        if stt.get("live_preview", False):
+            # A small second model transcribes while you speak; its hypotheses only feed
+            # the preview line, the main model still produces the committed text
+            options.update(
+                enable_realtime_transcription=True,
+                realtime_model_type=stt.get("preview_model", "tiny.en"),
+                realtime_processing_pause=stt.get("preview_interval", 0.2),
+                on_realtime_transcription_update=self.text_cache.show_partial,
+            )
+        return options
 
     def _shutdown_recorder(self):
         """Shut down the recorder to free the microphone."""
@@ -111,36 +263,84 @@ class SpeechTranscriptionApp:
             except Exception as e:
                 print(f"[Error] Failed to shut down recorder: {e}")
         self.recorder_active = False
+        self.consumer.notify()
+
+    def _pause_recorder(self):
+        """Stop taking microphone audio but keep the recorder and its model loaded."""
+        if self.recorder_initialized and self.recorder:
+            try:
+                self.recorder.set_microphone(False)
+                # Unblock a pending recorder.text() call so the main loop sees the pause
+                self.recorder.abort()
+                print("[Main] Paused microphone (model kept loaded)")
+            except Exception as e:
+                print(f"[Error] Failed to pause recorder: {e}")
+        self.recorder_active = False
+        self.consumer.notify()
+
+    def _resume_recorder(self):
+        """Resume microphone input on an already loaded recorder."""
+        self.recorder.set_microphone(True)
+        self.recorder_active = True
+        self.consumer.notify()
 
     def toggle_microphone(self, recording_state):
         """Toggle microphone usage based on recording state."""
+        if self.model_loading:
+            # The loader applies the final state once the model is ready
+            if not recording_state and self._prebuffer is not None:
+                # Stop recording right away; muted audio must never be transcribed
+                self._prebuffer.stop()
+            print(f"[Main] Microphone {'on' if recording_state else 'off'} once the model is loaded")
+            return
+
         if recording_state and not self.recorder_active:
-            # If recording should be enabled but recorder is inactive, initialize it
-            self._initialize_recorder()
-            print("[Main] Microphone activated")
+            start = time.perf_counter()
+            if self.recorder_initialized and self.mute_mode == "fast_resume":
+                self._resume_recorder()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                print(f"[Main] Microphone activated in {elapsed_ms:.0f} ms (warm resume)")
+            else:
+                # If recording should be enabled but recorder is inactive, load it
+                self._start_model_load()
         elif not recording_state and self.recorder_active:
-            # If recording should be disabled but recorder is active, shut it down
-            self._shutdown_recorder()
+            if self.mute_mode == "fast_resume":
+                self._pause_recorder()
+            else:
+                # If recording should be disabled but recorder is active, shut it down
+                self._shutdown_recorder()
             print("[Main] Microphone deactivated")
 
+    def _can_listen(self):
+        """Only process audio if recording is enabled and recorder is active."""
+        return (
+            self.text_cache.notification.is_recording_enabled()
+            and self.recorder_active
+            and self.recorder is not None
+        )
+
+    def request_shutdown(self):
+        """Ask the main loop to exit (e.g. when the window is closed)."""
+        self._stop_requested.set()
+
     def _run_main_loop(self):
-        """Run the main application loop."""
+        """Run the recorder consumer until shutdown is requested."""
+        self.consumer.start()
         try:
-            while True:
-                # Only process audio if recording is enabled and recorder is active
-                if self.text_cache.notification.is_recording_enabled() and self.recorder_active and self.recorder:
-                    self.recorder.text(
-                        lambda recognized_text: self.text_cache.add_text(
-                            recognized_text
-                        )
-                    )
-                time.sleep(0.05)
+            # The timeout only keeps Ctrl+C responsive on Windows; it does no work
+            while not self._stop_requested.wait(timeout=1.0):
+                pass
         except KeyboardInterrupt:
             print("\n[Main] Exiting by user request...")
 
     def cleanup(self):
         """Clean up resources before exit."""
-        # Shutdown the recorder
+        self._stop_requested.set()
+        self.consumer.stop(timeout=0)
+        if self._prebuffer is not None:
+            self._prebuffer.stop()
+
+        # Shutdown the recorder (this also unblocks the consumer's recorder.text())
         if self.recorder and self.recorder_initialized:
             self._shutdown_recorder()
 
@@ -151,4 +351,7 @@ class SpeechTranscriptionApp:
         self.text_cache.cleanup()
 
         # Clean up audio resources
-        cleanup_audio()
\ No newline at end of file
+        cleanup_audio()
+
+        # Flush latency histograms
+        metrics.stop_reporter()
\ No newline at end of file
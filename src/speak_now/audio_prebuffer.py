@@ -0,0 +1,90 @@
+import threading
+from collections import deque
+
+
+# Format AudioToTextRecorder.feed_audio() expects: 16-bit mono at 16 kHz
+SAMPLE_RATE = 16000
+FRAMES_PER_BUFFER = 1024
+
+
+# ---------------------------------------------------------------------
+# MICROPHONE PRE-BUFFER
+# ---------------------------------------------------------------------
+class MicPrebuffer:
+    """
+    Records the microphone with PyAudio while the STT model is still loading,
+    so speech from the first seconds after launch can be fed to the recorder
+    once it's ready instead of being lost. Keeps at most max_seconds of audio.
+    """
+
+    def __init__(self, max_seconds=30.0):
+        self.max_seconds = max_seconds
+        self.sample_rate = SAMPLE_RATE
+        self._chunks = deque()
+        self._lock = threading.Lock()
+        self._pyaudio = None
+        self._stream = None
+
+    def start(self):
+        """Open the microphone and start buffering. Returns False if it can't be opened."""
+        try:
+            import pyaudio
+
+            self._continue = pyaudio.paContinue
+            self._pyaudio = pyaudio.PyAudio()
+            try:
+                self._stream = self._open(pyaudio, SAMPLE_RATE)
+            except Exception:
+                # Device can't do 16 kHz; record at its native rate. feed_audio only resamples
+                # numpy arrays, so the loader converts the chunks before feeding them
+                info = self._pyaudio.get_default_input_device_info()
+                self.sample_rate = int(info["defaultSampleRate"])
+                self._stream = self._open(pyaudio, self.sample_rate)
+            self._chunks = deque(
+                maxlen=max(int(self.max_seconds * self.sample_rate / FRAMES_PER_BUFFER), 1)
+            )
+            self._stream.start_stream()
+            return True
+        except Exception as e:
+            print(f"[Prebuffer] Could not open the microphone: {e}")
+            self._close()
+            return False
+
+    def _open(self, pyaudio, rate):
+        return self._pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            input=True,
+            frames_per_buffer=FRAMES_PER_BUFFER,
+            stream_callback=self._callback,
+            start=False,
+        )
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        with self._lock:
+            self._chunks.append(in_data)
+        return (None, self._continue)
+
+    def stop(self):
+        """Release the microphone and return the buffered chunks, oldest first."""
+        self._close()
+        with self._lock:
+            chunks, self._chunks = list(self._chunks), deque()
+        return chunks
+
+    def seconds(self, chunks):
+        """Duration of chunks returned by stop()."""
+        return len(chunks) * FRAMES_PER_BUFFER / self.sample_rate
+
+    def _close(self):
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                print(f"[Prebuffer] Error closing the microphone: {e}")
+            self._stream = None
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
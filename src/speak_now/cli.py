@@ -2,7 +2,7 @@
 import os
 import sys
 import argparse
-from speak_now.app import SpeechTranscriptionApp
+from contextlib import nullcontext
 
 def main():
     """
@@ -28,10 +28,52 @@ def main():
         action="store_true",
         help="Start with UI hidden (overrides config setting)"
     )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print recorded latency percentiles (p50/p95/p99) and exit"
+    )
+
+    parser.add_argument(
+        "--calibrate-paste",
+        action="store_true",
+        help="Time typing vs. clipboard pasting on this machine, save the faster cut-off and exit"
+    )
+
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Start up (including loading the STT model), print time spent per phase and exit"
+    )
     
     
     # Parse arguments
     args = parser.parse_args()
+
+    if args.stats:
+        from speak_now.config import load_config
+        from speak_now.metrics import metrics_path, print_stats
+
+        print_stats(metrics_path(load_config(args.config_file)))
+        return
+
+    if args.calibrate_paste:
+        from speak_now.config import load_config
+        from speak_now.paste_calibration import calibrate_paste
+
+        calibrate_paste(load_config(args.config_file))
+        return
+
+    profiler = None
+    if args.profile_startup:
+        from speak_now.metrics import StartupProfiler
+
+        profiler = StartupProfiler()
+
+    # The app pulls in the GUI, audio and HTTP stacks; only import it once we know we need it
+    with profiler.phase("import app") if profiler else nullcontext():
+        from speak_now.app import SpeechTranscriptionApp
     
     # Check if config file exists
     if not os.path.exists(args.config_file):
@@ -40,7 +82,7 @@ def main():
         print(f"Using config file: {args.config_file}")
     try:
         # Initialize and start the application
-        app = SpeechTranscriptionApp(args.config_file)
+        app = SpeechTranscriptionApp(args.config_file, profiler=profiler)
         
         # If --hidden flag was used, override the config setting
         if args.hidden and hasattr(app, 'config') and 'ui' in app.config:
@@ -58,4 +100,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    cli_main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,227 @@
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pyperclip
+
+
+# Targets that describe the selection instead of holding its contents
+META_TARGETS = {
+    "TARGETS", "TIMESTAMP", "MULTIPLE", "SAVE_TARGETS", "DELETE", "INSERT_SELECTION", "INSERT_PROPERTY",
+}
+# Names plain text is offered under; a snapshot with nothing else is restored as text
+TEXT_TARGETS = {"UTF8_STRING", "STRING", "TEXT", "COMPOUND_TEXT", "text/plain", "text/plain;charset=utf-8"}
+XCLIP_TIMEOUT = 2.0
+
+
+def write_formats(stream, formats):
+    """Serialize {target: bytes} as a JSON header line followed by the raw data."""
+    header = [[target, len(data)] for target, data in formats.items()]
+    stream.write(json.dumps(header).encode("utf-8") + b"\n")
+    for data in formats.values():
+        stream.write(data)
+
+
+def read_formats(stream):
+    formats = {}
+    for target, size in json.loads(stream.readline()):
+        formats[target] = stream.read(size)
+    return formats
+
+
+class ClipboardSnapshot:
+    """Clipboard contents saved before a paste: the text, plus every format on X11."""
+
+    def __init__(self, text="", formats=None):
+        self.text = text
+        self.formats = formats or {}  # target -> bytes, in the owner's order of preference
+
+    @property
+    def rich(self):
+        """Holds more than text (an image, HTML, a file list, ...)."""
+        return any(target not in TEXT_TARGETS for target in self.formats)
+
+
+# ---------------------------------------------------------------------
+# CLIPBOARD BACKENDS
+# ---------------------------------------------------------------------
+class TextClipboard:
+    """Text only, through pyperclip. Used on Windows, macOS and Wayland."""
+
+    name = "pyperclip"
+
+    def get_text(self):
+        return pyperclip.paste()
+
+    def set_text(self, text):
+        pyperclip.copy(text)
+
+    def capture(self):
+        return ClipboardSnapshot(self.get_text())
+
+    def restore(self, snapshot):
+        self.set_text(snapshot.text)
+
+    def close(self):
+        pass
+
+
+class XclipClipboard(TextClipboard):
+    """
+    X11 clipboard through xclip that survives a paste with every target
+    intact. Restoring more than text needs python-xlib to serve all targets
+    at once (see x11_selection.py); without it only the owner's preferred
+    non-text target is kept.
+    """
+
+    name = "xclip"
+
+    def __init__(self):
+        self.serves_all_targets = importlib.util.find_spec("Xlib") is not None
+        if not self.serves_all_targets:
+            print("[Clipboard] python-xlib not installed; rich clipboard contents keep one format")
+
+    def _xclip(self, *args, data=None):
+        return subprocess.run(
+            ["xclip", "-selection", "clipboard", *args],
+            input=data,
+            capture_output=True,
+            timeout=XCLIP_TIMEOUT,
+            check=True,
+        ).stdout
+
+    def _read(self, target):
+        try:
+            return self._xclip("-o", "-t", target)
+        except (subprocess.SubprocessError, OSError):
+            return None  # Empty clipboard, or the owner refused this target
+
+    def targets(self):
+        data = self._read("TARGETS")
+        return data.decode("utf-8", errors="replace").split() if data else []
+
+    def capture(self):
+        targets = [t for t in self.targets() if t not in META_TARGETS]
+        if all(t in TEXT_TARGETS for t in targets):
+            # Plain text (or nothing): one read is enough
+            return ClipboardSnapshot(self.get_text())
+
+        formats = {t: data for t, data in zip(targets, self._read_all(targets)) if data is not None}
+        text = formats.get("UTF8_STRING", b"").decode("utf-8", errors="replace")
+        return ClipboardSnapshot(text, formats)
+
+    def _read_all(self, targets):
+        # Each read starts an xclip and is a round trip to the owning program; overlap them
+        with ThreadPoolExecutor(max_workers=min(len(targets), 8)) as pool:
+            return list(pool.map(self._read, targets))
+
+    def restore(self, snapshot):
+        if not snapshot.rich:
+            self.set_text(snapshot.text)
+            return
+        if self.serves_all_targets and self._serve_all(snapshot.formats):
+            return
+
+        # xclip serves a single target; keep the one the owner listed first
+        target = next(t for t in snapshot.formats if t not in TEXT_TARGETS)
+        # xclip forks to keep serving, so don't wait on its output pipes
+        subprocess.run(
+            ["xclip", "-selection", "clipboard", "-i", "-t", target],
+            input=snapshot.formats[target],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=XCLIP_TIMEOUT,
+        )
+
+    def _serve_all(self, formats):
+        helper = subprocess.Popen(
+            [sys.executable, "-m", "speak_now.x11_selection"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            start_new_session=True,  # Keeps serving after the app exits, like xclip
+        )
+        write_formats(helper.stdin, formats)
+        helper.stdin.close()
+        # Wait until it owns the clipboard, or the next paste could be overwritten
+        if helper.stdout.readline().strip() == b"owned":
+            return True
+        print("[Clipboard] Could not restore every format; keeping one")
+        return False
+
+
+class XlibClipboard(XclipClipboard):
+    """
+    X11 clipboard over one connection kept open for the app's lifetime
+    (python-xlib): reads, writes and restores without starting a process.
+    The app owns the clipboard itself after a copy; whatever it still owns
+    at exit is handed to the x11_selection helper so it stays pasteable.
+    """
+
+    name = "xlib"
+
+    def __init__(self):
+        from .x11_selection import ClipboardConnection
+
+        self.serves_all_targets = True
+        self.connection = ClipboardConnection()
+
+    def get_text(self):
+        data = self.connection.read("UTF8_STRING")
+        if data is not None:
+            return data.decode("utf-8", errors="replace")
+        data = self.connection.read("STRING")
+        return data.decode("latin-1") if data is not None else ""
+
+    def set_text(self, text):
+        from .x11_selection import text_formats
+
+        if not self.connection.write(text_formats(text)):
+            raise RuntimeError("X server did not give us the clipboard")
+
+    def targets(self):
+        return self.connection.targets()
+
+    def _read(self, target):
+        return self.connection.read(target)
+
+    def _read_all(self, targets):
+        # Sub-millisecond round trips on one connection; nothing to overlap
+        return [self.connection.read(target) for target in targets]
+
+    def restore(self, snapshot):
+        if not snapshot.rich:
+            self.set_text(snapshot.text)
+        elif not self.connection.write(snapshot.formats):
+            raise RuntimeError("X server did not give us the clipboard")
+
+    def close(self):
+        formats = self.connection.close()
+        if formats:
+            self._serve_all(formats)
+
+
+def clipboard_from_config(config):
+    """The clipboard backend named by paste.clipboard_backend ("auto", "xlib", "xclip" or "pyperclip")."""
+    name = config.get("paste", {}).get("clipboard_backend", "auto")
+    x11 = (
+        sys.platform.startswith("linux")
+        and os.environ.get("DISPLAY")
+        and not os.environ.get("WAYLAND_DISPLAY")
+    )
+    if name == "auto":
+        if x11 and importlib.util.find_spec("Xlib") is not None:
+            name = "xlib"
+        else:
+            name = "xclip" if x11 and shutil.which("xclip") else "pyperclip"
+
+    if name == "xlib":
+        try:
+            return XlibClipboard()
+        except Exception as e:
+            name = "xclip" if shutil.which("xclip") else "pyperclip"
+            print(f"[Clipboard] Could not connect to the X server ({e}), using {name}")
+    return XclipClipboard() if name == "xclip" else TextClipboard()
@@ -6,13 +6,37 @@ DEFAULT_CONFIG = {
     "api": {
         "gemini_api_key": "",  # Will also check environment variable
         "model": "gemini-1.5-flash",
+        "connect_timeout": 5.0,  # Seconds to establish the TCP/TLS connection
+        "read_timeout": 60.0,  # Seconds to wait for the response
+        "http2": False,  # Requires httpx[http2]; falls back to HTTP/1.1 keep-alive
+        "max_retries": 2,  # Retries after 429 / 5xx responses, within the deadline
+        "backoff_base": 0.25,  # Seconds; retry n waits a random 0..base*2^n (capped by backoff_max)
+        "backoff_max": 4.0,
+        "hedge": False,  # Send a second request if the first is slower than the usual p95
+        "hedge_model": "",  # Model for the hedged request (empty = same model)
+        "hedge_delay": 2.0,  # Hedge threshold in seconds until enough latencies are recorded
+        "hedge_min_delay": 0.25,  # Never hedge sooner than this
+    },
+    "stt": {
+        "model": "large-v2",
+        "timeout": 1.0,
+        # "fast_resume" keeps the model loaded while muted; "release_mic" unloads it
+        # and frees the microphone (slow to unmute)
+        "mute_mode": "fast_resume",
+        "live_preview": False,  # Show partial transcriptions while you speak
+        "preview_model": "tiny.en",  # Small model used for the live preview
+        "preview_interval": 0.2,  # Seconds between preview updates
+        "prebuffer": True,  # Record while the model loads and transcribe it once ready
+        "prebuffer_max_seconds": 30.0,  # Keep at most this much audio from the load
     },
-    "stt": {"model": "large-v2", "timeout": 1.0},
     "hotkeys": {
         "paste_raw": "ctrl+`",
         "paste_formatted": "alt+`",
         "toggle_recording": "ctrl+alt+space",
         "toggle_window": "ctrl+alt+v",  # New hotkey to toggle window visibility
+        "cancel_format": "ctrl+shift+`",  # Cancel an in-flight Format & Paste
+        "preview_all": "alt+shift+`",  # Format the cache in every style at once
+        "preview_pick": "alt+{n}",  # Paste the n-th previewed style (alt+1, alt+2, ...)
     },
     "ui": {
         "opacity": 0.90, 
@@ -20,16 +44,82 @@ DEFAULT_CONFIG = {
         "default_format": "Concise",
         "start_hidden": False,  # When true, UI will never show automatically, only when toggled with hotkey
     },
+    "formatting": {
+        "streaming": True,  # Show formatted text as it streams in (streamGenerateContent)
+        "progressive_paste": False,  # Paste each finished sentence while streaming
+        "workers": 2,  # Threads running formatting jobs off the cache lock
+        "local_remove_fillers": True,  # Local backend drops "um", "uh", ... as well
+        "chunk_threshold": 6000,  # Characters above which text is formatted in parallel chunks (0 = never)
+        "chunk_size": 2000,  # Target characters per chunk, cut at paragraph/sentence ends
+        "chunk_overlap": 200,  # Characters of the previous chunk sent along as context
+        "chunk_workers": 4,  # Chunks formatted concurrently
+    },
+    "paste": {
+        # "auto" types text up to type_threshold characters and uses the clipboard for
+        # longer text; "clipboard" or "type" always use one. Multi-line and non-ASCII
+        # text always goes through the clipboard
+        "strategy": "auto",
+        "type_threshold": 0,  # 0 = measured by speak-now --calibrate-paste (24 until then)
+        "type_backend": "keyboard",  # or "xdotool" on X11
+        # Longest wait for the clipboard to show copied text before pasting anyway; the
+        # actual wait is learned from how fast the clipboard confirms on this machine
+        "confirm_timeout": 0.25,
+        "poll_interval": 0.002,  # Seconds between clipboard checks while waiting
+        "restore_delay": 0.03,  # Seconds after Ctrl+V before the previous clipboard is put back
+        # X11: "xlib" keeps one connection to the X server (needs python-xlib) instead of
+        # starting xclip per call, and keeps images and other formats across a paste;
+        # "xclip" keeps them too. "pyperclip" keeps text only. "auto" picks the first that works
+        "clipboard_backend": "auto",
+        "persist": True,  # Keep the learned timings across restarts
+        "path": "",  # Defaults to ~/.cache/speak_now/paste_timings.json
+    },
+    "metrics": {
+        "enabled": True,  # Record latency histograms (view with: speak-now --stats)
+        "path": "",  # Defaults to ~/.cache/speak_now/metrics.jsonl
+        "interval": 60.0,  # Seconds between snapshots written to the file
+    },
+    "history": {
+        "archive": True,  # Append every history item to a local SQLite archive
+        "path": "",  # Defaults to ~/.cache/speak_now/history.sqlite3
+    },
+    "speculative": {
+        "enabled": False,  # Pre-format the cache in the background after speech goes quiet
+        "debounce": 1.5,  # Seconds of silence before speculating
+        "max_calls_per_minute": 4,  # Cap on speculative Gemini calls
+    },
+    "format_cache": {
+        "max_entries": 256,  # Formatted results kept in memory (LRU)
+        "persist": False,  # Also keep results in a SQLite file across restarts
+        "path": "",  # Defaults to ~/.cache/speak_now/format_cache.sqlite3
+        "max_disk_entries": 5000,
+    },
     "formatting_prompts": {
         "Natural": "Reformat this transcription to sound more natural and fix any grammar issues: ",
         "Formal": "Reformat this transcription into formal, professional language: ",
         "Concise": "Reformat this transcription to be more concise while preserving all important information: ",
         "Catgirl": "Reformat this transcription to sound like a cute catgirl talking: ",
+        "Clean": "Fix capitalization, punctuation and repeated words in this transcription without rewording it: ",
         "None": "",  # No formatting
     },
+    # Seconds a Format & Paste may take per style before it gives up; "default" covers
+    # styles without their own entry (0 = no limit)
+    "deadlines": {
+        "default": 30.0,
+    },
+    # Which backend formats each style: "gemini" (default) or "local" (offline, rule-based
+    # cleanup in milliseconds; the style's prompt is ignored)
+    "formatting_backends": {
+        "Clean": "local",
+    },
 }
 
 
+def default_cache_dir():
+    """Per-user cache directory for speak-now artifacts."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "speak_now")
+
+
 def load_config(CONFIG_FILE):
     """Load configuration from file or create default if not exists"""
     try:
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .config import default_cache_dir
+
+
+# ---------------------------------------------------------------------
+# FORMAT CACHE
+# ---------------------------------------------------------------------
+class _InFlight:
+    """A formatting call other threads can wait on instead of repeating it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FormatCache:
+    """
+    Bounded LRU of formatted results keyed by normalized text, style, model
+    and prompt hash, with an optional SQLite store that survives restarts.
+
+    Concurrent get_or_compute() calls for the same key share one call.
+    """
+
+    def __init__(self, max_entries=256, db_path=None, max_disk_entries=5000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.collapsed = 0  # Requests served by joining an identical in-flight call
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._puts_since_prune = 0
+        if db_path:
+            try:
+                self._open_db(db_path)
+            except sqlite3.Error as e:
+                print(f"[FormatCache] Could not open {db_path}: {e}. Using memory only.")
+                self._db = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a cache from the [format_cache] section of the app config."""
+        section = config.get("format_cache", {})
+        db_path = None
+        if section.get("persist", False):
+            db_path = section.get("path") or os.path.join(default_cache_dir(), "format_cache.sqlite3")
+        return cls(
+            max_entries=section.get("max_entries", 256),
+            db_path=db_path,
+            max_disk_entries=section.get("max_disk_entries", 5000),
+        )
+
+    def _open_db(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS format_cache ("
+            " key TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(text, style, model, prompt):
+        """Cache key for formatting `text` in `style` with `model` and `prompt`."""
+        normalized = re.sub(r"\s+", " ", text).strip()
+        prompt_hash = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+        raw = "\0".join((model, style, prompt_hash, normalized))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached result for `key`, or None."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = self._load(key)
+        with self._lock:
+            if result is not None:
+                self.disk_hits += 1
+                self._remember(key, result)
+            else:
+                self.misses += 1
+        return result
+
+    def put(self, key, result):
+        """Store a formatted result in memory and, if enabled, on disk."""
+        with self._lock:
+            self._remember(key, result)
+        self._store(key, result)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result for `key`, calling compute() on a miss.
+        If an identical call is already running, wait for it instead.
+        None results (cancelled or failed calls) are not cached.
+        """
+        while True:
+            result = self.get(key)
+            if result is not None:
+                return result
+
+            with self._lock:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _InFlight()
+                else:
+                    self.collapsed += 1
+
+            if not leader:
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                if flight.result is not None:
+                    return flight.result
+                # The leader gave up (e.g. it was cancelled); try again ourselves
+                continue
+
+            try:
+                flight.result = compute()
+                if flight.result is not None:
+                    self.put(key, flight.result)
+                return flight.result
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                flight.done.set()
+
+    def stats(self):
+        """Hit/miss counters for display and logging."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "collapsed": self.collapsed,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def _remember(self, key, result):
+        # Caller holds self._lock
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT result FROM format_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE format_cache SET last_used = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._db.commit()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"[FormatCache] Disk read failed: {e}")
+            return None
+
+    def _store(self, key, result):
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO format_cache (key, result, last_used) VALUES (?, ?, ?)",
+                    (key, result, time.time()),
+                )
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= 100:
+                    self._puts_since_prune = 0
+                    self._db.execute(
+                        "DELETE FROM format_cache WHERE key NOT IN ("
+                        " SELECT key FROM format_cache ORDER BY last_used DESC LIMIT ?)",
+                        (self.max_disk_entries,),
+                    )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"[FormatCache] Disk write failed: {e}")
+
+    def close(self):
+        """Close the on-disk store."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,403 @@
+import json
+import random
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import metrics
+
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# Hedging uses the observed p95 once this many samples exist, hedge_delay until then
+HEDGE_MIN_SAMPLES = 20
+
+
+class GeminiError(Exception):
+    """The API answered with a non-200 status."""
+
+    def __init__(self, status_code, body, retry_after=None):
+        super().__init__(f"API request failed: {status_code} - {body}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        # Rate limiting and server-side failures are worth another try
+        return self.status_code == 429 or self.status_code >= 500
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before the API answered."""
+
+
+# ---------------------------------------------------------------------
+# GEMINI CLIENT
+# ---------------------------------------------------------------------
+class GeminiClient:
+    """Long-lived Gemini API client that reuses pooled keep-alive connections.
+
+    Uses a ``requests.Session`` by default. With ``http2=True`` it switches to
+    ``httpx`` (needs ``pip install httpx[http2]``) and falls back to requests
+    when that isn't installed.
+
+    Calls take an optional deadline in seconds. 429 and 5xx responses are
+    retried with jittered exponential backoff while the deadline allows. With
+    ``hedge=True`` a second request (to ``hedge_model`` if set) is fired when
+    the first hasn't answered within the observed p95; the first answer wins
+    and the other request is closed.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        base_url=GEMINI_BASE_URL,
+        connect_timeout=5.0,
+        read_timeout=60.0,
+        pool_size=4,
+        http2=False,
+        verify=True,
+        max_retries=2,
+        backoff_base=0.25,
+        backoff_max=4.0,
+        hedge=False,
+        hedge_model="",
+        hedge_delay=2.0,
+        hedge_min_delay=0.25,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.http2 = False
+        self._headers = {"Content-Type": "application/json", "x-goog-api-key": api_key}
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_model = hedge_model
+        self.hedge_delay = hedge_delay
+        self.hedge_min_delay = hedge_min_delay
+
+        self._client = None
+        if http2:
+            try:
+                import httpx
+
+                self._httpx = httpx
+                self._client = httpx.Client(
+                    http2=True,
+                    verify=verify,
+                    headers=self._headers,
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                    limits=httpx.Limits(
+                        max_connections=pool_size, max_keepalive_connections=pool_size
+                    ),
+                )
+                self.http2 = True
+            except ImportError as e:
+                print(f"[Gemini] HTTP/2 unavailable ({e}), using HTTP/1.1 keep-alive")
+
+        if self._client is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(self._headers)
+            self._client = session
+        # Passed per request: requests lets CA-bundle env vars override session.verify
+        self._verify = verify
+
+    @classmethod
+    def from_config(cls, config, api_key):
+        """Build a client from the [api] section of the app config."""
+        api = config["api"]
+        return cls(
+            api_key,
+            base_url=api.get("base_url", GEMINI_BASE_URL),
+            connect_timeout=api.get("connect_timeout", 5.0),
+            read_timeout=api.get("read_timeout", 60.0),
+            http2=api.get("http2", False),
+            max_retries=api.get("max_retries", 2),
+            backoff_base=api.get("backoff_base", 0.25),
+            backoff_max=api.get("backoff_max", 4.0),
+            hedge=api.get("hedge", False),
+            hedge_model=api.get("hedge_model", ""),
+            hedge_delay=api.get("hedge_delay", 2.0),
+            hedge_min_delay=api.get("hedge_min_delay", 0.25),
+        )
+
+    def _timeout(self, deadline_at):
+        """(connect, read) timeout for one attempt, capped by the time left before the deadline."""
+        connect, read = self.timeout
+        if deadline_at is not None:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("Deadline passed before the request was sent")
+            connect, read = min(connect, remaining), min(read, remaining)
+        if self.http2:
+            return self._httpx.Timeout(read, connect=connect)
+        return (connect, read)
+
+    def _post(self, url, data, timeout, params=None, stream=False):
+        if self.http2:
+            request = self._client.build_request("POST", url, json=data, params=params, timeout=timeout)
+            return self._client.send(request, stream=stream)
+        return self._client.post(
+            url, json=data, params=params, timeout=timeout, verify=self._verify, stream=stream
+        )
+
+    def _error(self, response):
+        if self.http2:
+            response.read()  # httpx streaming responses need the body loaded first
+        try:
+            retry_after = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            retry_after = None
+        return GeminiError(response.status_code, response.text, retry_after)
+
+    @staticmethod
+    def _deadline_at(deadline):
+        return None if deadline is None else time.monotonic() + deadline
+
+    # -----------------------------------------------------------------
+    # Retries and hedging
+    # -----------------------------------------------------------------
+    def _with_retries(self, attempt, model, deadline_at, cancelled):
+        """Run attempt(model), retrying retryable failures with full-jitter backoff."""
+        retry = 0
+        while True:
+            try:
+                return attempt(model)
+            except GeminiError as e:
+                if not e.retryable or retry >= self.max_retries or cancelled.is_set():
+                    raise
+                if e.retry_after is not None:
+                    delay = min(e.retry_after, self.backoff_max)
+                else:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    raise
+                retry += 1
+                print(
+                    f"[Gemini] {e.status_code} from {model}, retry {retry}/{self.max_retries} "
+                    f"in {delay * 1000:.0f} ms"
+                )
+                if cancelled.wait(delay):
+                    raise
+            except Exception as e:
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    raise DeadlineExceeded(f"No answer from {model} before the deadline") from e
+                raise
+
+    def hedge_threshold(self, span):
+        """Seconds to wait before hedging: the span's observed p95, or hedge_delay until known."""
+        p95 = metrics.percentile(span, 0.95, min_count=HEDGE_MIN_SAMPLES)
+        return max(self.hedge_min_delay, self.hedge_delay if p95 is None else p95)
+
+    def _call(self, attempt, model, deadline_at, span, discard=None):
+        """
+        Run attempt(model) with retries, hedged if enabled. `discard` releases
+        the result of a request that lost the race (e.g. closes its stream).
+        """
+        if not self.hedge:
+            return self._with_retries(attempt, model, deadline_at, threading.Event())
+
+        racers = {}
+
+        def launch(target_model):
+            # A thread per racer: a shared pool would queue hedges behind other callers' requests
+            cancelled = threading.Event()
+            future = Future()
+
+            def run():
+                future.set_running_or_notify_cancel()
+                try:
+                    future.set_result(self._with_retries(attempt, target_model, deadline_at, cancelled))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            threading.Thread(target=run, name="gemini-hedge", daemon=True).start()
+            racers[future] = cancelled
+
+        def remaining():
+            return None if deadline_at is None else max(0.0, deadline_at - time.monotonic())
+
+        launch(model)
+        threshold = self.hedge_threshold(span)
+        timeout = threshold if deadline_at is None else min(threshold, remaining())
+        done, _ = wait(racers, timeout=timeout)
+        if not done and (deadline_at is None or remaining() > 0):
+            hedge_model = self.hedge_model or model
+            print(f"[Gemini] No answer after {threshold * 1000:.0f} ms, hedging with {hedge_model}")
+            launch(hedge_model)
+
+        pending, error = set(racers), None
+        while pending:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                break  # Deadline passed
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        self._abandon(loser, racers[loser], discard)
+                    return future.result()
+                error = future.exception()
+
+        for loser in pending:
+            self._abandon(loser, racers[loser], discard)
+        if pending or error is None:
+            raise DeadlineExceeded(f"No answer from {model} before the deadline")
+        raise error
+
+    @staticmethod
+    def _abandon(future, cancelled, discard):
+        """Stop a losing request from retrying and release whatever it produces."""
+        cancelled.set()
+        if discard is None:
+            return
+
+        def release(finished):
+            if finished.exception() is None:
+                discard(finished.result())
+
+        future.add_done_callback(release)
+
+    # -----------------------------------------------------------------
+    # API calls
+    # -----------------------------------------------------------------
+    def generate(self, prompt, model, deadline=None):
+        """Generates content using Google's Generative Language API."""
+        deadline_at = self._deadline_at(deadline)
+        # The body is only read from the winner; a losing response is closed unread
+        response = self._call(
+            lambda target: self._generate_once(prompt, target, deadline_at),
+            model,
+            deadline_at,
+            span="gemini_rtt",
+            discard=lambda lost: lost.close(),
+        )
+        try:
+            if self.http2:
+                response.read()
+            return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError) as e:
+            raise ValueError("Unexpected API response format") from e
+        finally:
+            response.close()
+
+    def _generate_once(self, prompt, model, deadline_at):
+        """Send a generateContent request and return its response once the headers are in."""
+        url = f"{self.base_url}/models/{model}:generateContent"
+        data = {
+            "contents": [
+                {"parts": [{"text": prompt}]},
+            ],
+        }
+        timeout = self._timeout(deadline_at)
+        with metrics.span("gemini_rtt"):
+            response = self._post(url, data, timeout, stream=True)
+
+        if response.status_code != 200:
+            try:
+                raise self._error(response)
+            finally:
+                response.close()
+        return response
+
+    def stream_generate(self, prompt, model, deadline=None):
+        """Yield text chunks from streamGenerateContent as server-sent events arrive."""
+        deadline_at = self._deadline_at(deadline)
+        # Retries and hedging cover the wait for the first chunk
+        response, first, chunks = self._call(
+            lambda target: self._open_stream(prompt, target, deadline_at),
+            model,
+            deadline_at,
+            span="gemini_ttft",
+            discard=lambda opened: opened[0].close(),
+        )
+        try:
+            if first is None:
+                return
+            yield first
+            for chunk in chunks:
+                if deadline_at is not None and time.monotonic() > deadline_at:
+                    raise DeadlineExceeded(f"{model} was still streaming at the deadline")
+                yield chunk
+        finally:
+            response.close()
+
+    def _open_stream(self, prompt, model, deadline_at):
+        """Start a stream and read up to its first text chunk: (response, first, rest)."""
+        url = f"{self.base_url}/models/{model}:streamGenerateContent"
+        data = {
+            "contents": [
+                {"parts": [{"text": prompt}]},
+            ],
+        }
+        timeout = self._timeout(deadline_at)
+        start = time.perf_counter()
+        response = self._post(url, data, timeout, params={"alt": "sse"}, stream=True)
+        try:
+            if response.status_code != 200:
+                raise self._error(response)
+            if self.http2:
+                lines = response.iter_lines()
+            else:
+                lines = response.iter_lines(decode_unicode=True)
+            chunks = self._timed_chunks(self._iter_sse_text(lines), start)
+            return response, next(chunks, None), chunks
+        except BaseException:
+            response.close()
+            raise
+
+    @staticmethod
+    def _timed_chunks(chunks, start):
+        """Pass chunks through, recording time to first chunk and full stream duration."""
+        first = True
+        for chunk in chunks:
+            if first:
+                metrics.record("gemini_ttft", time.perf_counter() - start)
+                first = False
+            yield chunk
+        metrics.record("gemini_rtt", time.perf_counter() - start)
+
+    @staticmethod
+    def _iter_sse_text(lines):
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line.startswith("data:"):
+                continue
+            try:
+                event = json.loads(line[5:].strip())
+            except ValueError as e:
+                raise ValueError("Unexpected API response format") from e
+            # The final event may carry only finishReason / usage metadata
+            candidates = event.get("candidates") or [{}]
+            parts = candidates[0].get("content", {}).get("parts", [])
+            text = "".join(part.get("text", "") for part in parts)
+            if text:
+                yield text
+
+    def warm_up(self, model):
+        """Open a pooled connection in the background so the first format skips the handshake."""
+
+        def _connect():
+            try:
+                url = f"{self.base_url}/models/{model}"
+                if self.http2:
+                    self._client.get(url)
+                else:
+                    self._client.get(url, timeout=self.timeout, verify=self._verify)
+            except Exception as e:
+                print(f"[Gemini] Connection warm-up failed: {e}")
+
+        threading.Thread(target=_connect, daemon=True).start()
+
+    def close(self):
+        """Close pooled connections."""
+        self._client.close()
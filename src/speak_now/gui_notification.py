@@ -1,8 +1,11 @@
+import os
 import queue
 import threading
 import time
 from datetime import datetime
 from tkinter import (
+    READABLE,
+    TclError,
     Tk,
     Toplevel,
     Label,
@@ -15,7 +18,20 @@ from tkinter import (
     BooleanVar,
 )
 from .utils import play_sound
-
+from .history_store import HistoryStore
+from .metrics import metrics
+
+# Fallback drain interval in case a wake-up is lost
+SAFETY_POLL_MS = 1000
+# Wake-up check interval where Tk can't watch a pipe (Windows)
+WAKE_POLL_MS = 10
+# Messages that replace the content label; only the newest in a burst is rendered
+CONTENT_MESSAGES = ("content", "format_partial", "format_result")
+# Style preview messages; every one is rendered, in order
+PREVIEW_MESSAGES = ("preview_start", "preview_result", "preview_close")
+# Window height without and with the style preview panel
+WINDOW_GEOMETRY = "400x320"
+PREVIEW_WINDOW_GEOMETRY = "400x430"
 
 # ---------------------------------------------------------------------
 # GUI NOTIFICATION CLASS
@@ -25,12 +41,28 @@ class EnhancedNotification:
 
     def __init__(self, format_callback, config):
         self.message_queue = queue.Queue()
+        self._wake_lock = threading.Lock()
+        self._wake_pending = False
+        self._wake_write = None  # Write end of the pipe the Tk thread watches
+
+        # Throttling for live-preview updates
+        self.partial_interval = config["stt"].get("preview_interval", 0.2)
+        self._partial_lock = threading.Lock()
+        self._partial_timer = None
+        self._pending_partial = None
+        self._last_partial_post = 0.0
         self.format_callback = format_callback
         self.current_text = ""
-        self.history = []  # Store history items
+        self.showing_cache = False  # True while the content label shows the live cache
+        self.history_store = HistoryStore.from_config(config)
+        self.history = self.history_store.recent  # Newest last, bounded by max_history_items
         self.config = config
         self.recording_active = True  # Start with recording enabled
         self.app_reference = None  # Reference to main app for microphone control
+        self.format_change_callback = None
+        self.preview_callback = None
+        self.preview_paste_callback = None
+        self.preview_styles = []  # Styles in the open style preview, in display order
 
         self.root = None
         self.popup = None
@@ -40,17 +72,23 @@ class EnhancedNotification:
         self.history_listbox = None
 
         self.running = False
+        self._start_gui()
+
+    def _start_gui(self):
+        """Start the Tk thread (headless benchmarks override this)."""
         self.thread = threading.Thread(target=self._run_gui, daemon=True)
         self.thread.start()
         time.sleep(0.1)  # Wait for GUI thread to initialize
 
     def _run_gui(self):
         """Initialize and run the GUI in a separate thread."""
+        wake_read = None
         try:
             self.root = Tk()
             self.root.withdraw()
             self.format_var = StringVar(self.root)
             self.format_var.set(self.config["ui"]["default_format"])
+            self.format_var.trace_add("write", self._on_format_changed)
 
             self._setup_main_window()
             self._setup_title_bar()
@@ -60,18 +98,49 @@ class EnhancedNotification:
             self._setup_status_bar()
 
             # Set size and center
-            self.popup.geometry("400x320")
+            self.popup.geometry(WINDOW_GEOMETRY)
             self._center_window()
             
             # Hide window on startup if configured
             if self.config["ui"].get("start_hidden", False):
                 self.popup.withdraw()
 
+            wake_read = self._watch_wake_pipe()
             self.running = True
-            self._process_queue()
+            self._safety_poll()
             self.root.mainloop()
         except Exception as e:
             print(f"GUI thread error: {e}")
+        finally:
+            self._close_wake_pipe(wake_read)
+
+    def _watch_wake_pipe(self):
+        """
+        Have the Tk thread drain the queue when a byte arrives on a pipe.
+        Other threads must not call into Tcl to wake it: event_generate
+        blocks until the Tk thread runs it, which deadlocks when the Tk
+        thread is waiting on a lock the poster holds.
+        """
+        wake_read, wake_write = os.pipe()
+        os.set_blocking(wake_write, False)
+        try:
+            self.root.tk.createfilehandler(wake_read, READABLE, self._on_wake_pipe)
+        except (AttributeError, TclError):
+            # No file handlers on Windows; check the pending flag on a short timer instead
+            os.close(wake_read)
+            os.close(wake_write)
+            self._wake_poll()
+            return None
+        self._wake_write = wake_write
+        return wake_read
+
+    def _close_wake_pipe(self, wake_read):
+        if wake_read is None:
+            return
+        with self._wake_lock:
+            wake_write, self._wake_write = self._wake_write, None
+        os.close(wake_write)
+        os.close(wake_read)
 
     def is_window_visible(self):
         """Returns True if the main popup is visible (not withdrawn)."""
@@ -185,6 +254,45 @@ class EnhancedNotification:
         )
         self.content_label.pack(fill="both", expand=True, pady=(0, 10))
 
+        # Live, uncommitted hypothesis from the realtime model (kept apart from the cache)
+        self.preview_label = Label(
+            content_frame,
+            text="",
+            font=("Segoe UI", 9, "italic"),
+            fg="#999999",
+            bg="#333333",
+            wraplength=370,
+            justify="left",
+            anchor="w",
+        )
+        if self.config["stt"].get("live_preview", False):
+            self.preview_label.pack(fill="x", pady=(0, 5))
+
+        # All styles side by side after "Preview All"; packed only while a preview is open
+        self.style_preview_frame = Frame(content_frame, bg="#333333")
+        pick = self.config["hotkeys"].get("preview_pick", "")
+        hint = f" ({pick.replace('{n}', 'N')} or double-click to paste)" if pick else " (double-click to paste)"
+        Label(
+            self.style_preview_frame,
+            text="Preview" + hint,
+            font=("Segoe UI", 9, "bold"),
+            fg="#FFFFFF",
+            bg="#333333",
+        ).pack(anchor="w", pady=(0, 3))
+        self.style_preview_listbox = Listbox(
+            self.style_preview_frame,
+            height=4,
+            font=("Segoe UI", 8),
+            fg="#DDDDDD",
+            bg="#3A3A3A",
+            selectbackground="#505050",
+            bd=0,
+            highlightthickness=1,
+            highlightcolor="#444444",
+        )
+        self.style_preview_listbox.pack(fill="x", expand=True)
+        self.style_preview_listbox.bind("<Double-1>", self._on_style_preview_select)
+
     def _setup_history_panel(self):
         """Setup the history panel to display previous transcriptions."""
         history_frame = Frame(self.main_frame, bg="#2A2A2A", padx=15, pady=5)
@@ -222,6 +330,55 @@ class EnhancedNotification:
         self.history_listbox.config(yscrollcommand=scrollbar.set)
         scrollbar.config(command=self.history_listbox.yview)
 
+        self._refresh_history_list()
+
+    def _refresh_history_list(self):
+        """Redraw the history listbox, newest item first."""
+        self.history_listbox.delete(0, "end")
+        for item in reversed(self.history):
+            stamp = datetime.fromtimestamp(item["timestamp"]).strftime("%H:%M")
+            text = " ".join(item["text"].split())
+            if len(text) > 80:
+                text = text[:77] + "..."
+            self.history_listbox.insert("end", f"{stamp}  {text}")
+
+    def _show_style_preview(self, styles):
+        """Open the preview panel with a pending row per style."""
+        self.preview_styles = list(styles)
+        self.style_preview_listbox.delete(0, "end")
+        for index, style in enumerate(self.preview_styles, 1):
+            self.style_preview_listbox.insert("end", f"{index}. {style}: formatting...")
+        self.style_preview_listbox.config(height=min(max(len(styles), 1), 6))
+        if not self.style_preview_frame.winfo_ismapped():
+            self.style_preview_frame.pack(fill="x", pady=(0, 5))
+            self.popup.geometry(PREVIEW_WINDOW_GEOMETRY)
+
+    def _update_style_preview(self, style, text):
+        """Fill in one style's row once its result arrives."""
+        if style not in self.preview_styles:
+            return
+        index = self.preview_styles.index(style)
+        if text is None:
+            row = f"{index + 1}. {style}: failed"
+        else:
+            text = " ".join(text.split())
+            row = f"{index + 1}. {style}: {text[:77] + '...' if len(text) > 80 else text}"
+        self.style_preview_listbox.delete(index)
+        self.style_preview_listbox.insert(index, row)
+
+    def _hide_style_preview(self):
+        self.preview_styles = []
+        if self.style_preview_frame.winfo_ismapped():
+            self.style_preview_frame.pack_forget()
+            self.popup.geometry(WINDOW_GEOMETRY)
+
+    def _on_style_preview_select(self, event):
+        """Handle double-click on a preview row."""
+        selection = self.style_preview_listbox.curselection()
+        if selection and self.preview_paste_callback:
+            style = self.preview_styles[selection[0]]
+            threading.Thread(target=self.preview_paste_callback, args=(style,), daemon=True).start()
+
     def _setup_controls(self):
         """Setup the control panel with formatting options and paste buttons."""
         controls_frame = Frame(self.main_frame, bg="#333333", padx=15, pady=8)
@@ -256,6 +413,20 @@ class EnhancedNotification:
         )
         format_menu.pack(side="left", padx=(0, 10))
 
+        preview_button = Button(
+            controls_frame,
+            text="Preview All",
+            font=("Segoe UI", 9),
+            fg="#FFFFFF",
+            bg="#555555",
+            activebackground="#666666",
+            bd=0,
+            padx=8,
+            pady=2,
+            command=self._request_preview,
+        )
+        preview_button.pack(side="left")
+
         raw_button = Button(
             controls_frame,
             text=f"Paste Raw ({self.config['hotkeys']['paste_raw']})",
@@ -344,6 +515,8 @@ class EnhancedNotification:
         if self.root:
             self.running = False
             self.root.quit()
+        if self.app_reference:
+            self.app_reference.request_shutdown()
 
     def _show_window(self):
         """Show the window if it was minimized."""
@@ -373,101 +546,259 @@ class EnhancedNotification:
         if self.app_reference:
             self.app_reference.toggle_microphone(self.recording_active)
 
-    def _process_queue(self):
-        """Process messages from the queue to update the UI."""
+    def post(self, message_type, message):
+        """Queue a UI update and wake the GUI thread to render it."""
+        if not self.running:
+            return
+        self.message_queue.put((message_type, message, time.perf_counter()))
+        self._wake()
+
+    def _wake(self):
+        """Schedule one queue drain on the Tk thread (extra posts piggyback on it)."""
+        with self._wake_lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+            if self._wake_write is None:
+                return  # GUI not ready, or Windows: a timer checks the flag
+            try:
+                os.write(self._wake_write, b"\0")
+            except BlockingIOError:
+                pass  # Pipe full; the Tk thread is already due to drain
+            except OSError:
+                # Shutting down; the safety poll picks the message up
+                self._wake_pending = False
+
+    def _on_wake_pipe(self, fd, mask):
+        try:
+            os.read(fd, 512)
+        except BlockingIOError:
+            pass
+        self._process_queue()
+
+    def _wake_poll(self):
+        """Windows stand-in for the wake pipe."""
+        if self._wake_pending:
+            self._process_queue()
+        self.root.after(WAKE_POLL_MS, self._wake_poll)
+
+    def _safety_poll(self):
+        """Slow fallback drain in case a wake-up was ever lost."""
+        if not self.running:
+            return
+        self._process_queue()
+        self.root.after(SAFETY_POLL_MS, self._safety_poll)
+
+    def _process_queue(self, event=None):
+        """Drain the queue and render the coalesced updates."""
+        with self._wake_lock:
+            self._wake_pending = False
         if not self.running or not self.content_label:
             return
 
         try:
-            while not self.message_queue.empty():
-                message_type, message = self.message_queue.get_nowait()
-                start_hidden = self.config["ui"].get("start_hidden", False)
-
-                if message_type == "content":
-                    # Display the most recent part of long text instead of the beginning
-                    if len(message) > 200:
-                        # Keep the last 200 characters for display
-                        display_message = "..." + message[-197:]
-                    else:
-                        display_message = message
-
-                    self.current_text = message
-                    self.content_label.config(text=display_message)
-
-                    # Only auto-show if window either wasn't configured to start hidden
-                    # or the user has explicitly toggled it (i.e., popup not withdrawn).
-                    if not start_hidden or self.is_window_visible():
-                        self._show_window()
-
-                elif message_type == "status":
-                    self.status_label.config(text=message)
-
-                elif message_type == "format_result":
-                    if len(message) > 200:
-                        display_message = "..." + message[-197:]
-                    else:
-                        display_message = message
-
-                    self.current_text = message
-                    self.content_label.config(text=display_message)
-                    self.status_label.config(text="Formatting complete")
-
-                    if not start_hidden or self.is_window_visible():
-                        self._show_window()
-
-                elif message_type == "add_history":
-                    # ... (history logic unchanged) ...
-                    pass
-
-            self.root.after(100, self._process_queue)
+            for item in self._coalesce(self._drain_queue()):
+                self._render(item)
         except Exception as e:
             print(f"Error processing queue: {e}")
-            self.root.after(100, self._process_queue)
 
+    def _drain_queue(self):
+        """Take every queued message without blocking."""
+        items = []
+        while True:
+            try:
+                items.append(self.message_queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    @staticmethod
+    def _coalesce(items):
+        """
+        Reduce a burst of messages to what needs rendering: the newest content
+        message first, then the newest status, then every history and preview item
+        in order.
+        """
+        content_index, status_index, partial_index = -1, -1, -1
+        history, previews = [], []
+        for index, item in enumerate(items):
+            if item[0] in CONTENT_MESSAGES:
+                content_index = index
+            elif item[0] == "partial":
+                partial_index = index
+            elif item[0] == "status":
+                status_index = index
+            elif item[0] == "add_history":
+                history.append(item)
+            elif item[0] in PREVIEW_MESSAGES:
+                previews.append(item)
+
+        batch = []
+        if content_index >= 0:
+            batch.append(items[content_index])
+        # format_result sets its own status; an older status must not overwrite it
+        content_sets_status = content_index > status_index and items[content_index][0] == "format_result"
+        if status_index >= 0 and not content_sets_status:
+            batch.append(items[status_index])
+        # A committed utterance clears the preview, so only a newer partial matters
+        if partial_index > content_index:
+            batch.append(items[partial_index])
+        return batch + history + previews
+
+    def _render(self, item):
+        """Apply one message to the widgets."""
+        message_type, message = item[0], item[1]
+        metrics.record("gui_enqueue_to_render", time.perf_counter() - item[2])
+        start_hidden = self.config["ui"].get("start_hidden", False)
+
+        if message_type in CONTENT_MESSAGES:
+            # Display the most recent part of long text instead of the beginning
+            if len(message) > 200:
+                # Keep the last 200 characters for display
+                display_message = "..." + message[-197:]
+            else:
+                display_message = message
+
+            self.current_text = message
+            self.showing_cache = message_type == "content"
+            self.content_label.config(text=display_message)
+            if message_type == "content":
+                self.preview_label.config(text="")
+
+            if message_type == "format_result":
+                self.status_label.config(text="Formatting complete")
+
+            # Only auto-show if window either wasn't configured to start hidden
+            # or the user has explicitly toggled it (i.e., popup not withdrawn).
+            if not start_hidden or self.is_window_visible():
+                self._show_window()
+
+        elif message_type == "status":
+            self.status_label.config(text=message)
+
+        elif message_type == "partial":
+            if len(message) > 200:
+                message = "..." + message[-197:]
+            self.preview_label.config(text=message)
+
+        elif message_type == "add_history":
+            self.history_store.add(message)
+            self._refresh_history_list()
+
+        elif message_type == "preview_start":
+            self._show_style_preview(message)
+            if not start_hidden or self.is_window_visible():
+                self._show_window()
+
+        elif message_type == "preview_result":
+            self._update_style_preview(*message)
+
+        elif message_type == "preview_close":
+            self._hide_style_preview()
 
     def _on_history_item_select(self, event):
         """Handle double-click on history item."""
         if self.history_listbox.curselection():
-            index = self.history_listbox.curselection()[0]
+            # The listbox shows the newest item first
+            index = len(self.history) - 1 - self.history_listbox.curselection()[0]
             if 0 <= index < len(self.history):
                 self.current_text = self.history[index]["text"]
+                self.showing_cache = False
                 self.content_label.config(text=self.current_text)
 
     def show_content(self, message):
-        """Show content in the UI and add to history."""
+        """Show the live cache in the UI."""
         if self.running:
-            self.message_queue.put(("content", message))
-            self.message_queue.put(("add_history", message))
+            # The committed text supersedes any preview still waiting to be posted
+            self._cancel_pending_partial()
+            self.post("content", message)
+
+    def show_partial(self, text):
+        """Show an in-progress hypothesis, posting at most once per preview interval."""
+        if not self.running:
+            return
+        with self._partial_lock:
+            self._pending_partial = text
+            if self._partial_timer is not None:
+                return  # A trailing post is already scheduled and will pick this up
+            wait = self._last_partial_post + self.partial_interval - time.monotonic()
+            if wait > 0:
+                self._partial_timer = threading.Timer(wait, self._flush_partial)
+                self._partial_timer.daemon = True
+                self._partial_timer.start()
+                return
+        self._flush_partial()
+
+    def _flush_partial(self):
+        with self._partial_lock:
+            text = self._pending_partial
+            self._pending_partial = None
+            self._partial_timer = None
+            self._last_partial_post = time.monotonic()
+        if text is not None:
+            self.post("partial", text)
+
+    def _cancel_pending_partial(self):
+        with self._partial_lock:
+            self._pending_partial = None
+            if self._partial_timer is not None:
+                self._partial_timer.cancel()
+                self._partial_timer = None
 
     def update_status(self, message):
         """Update the status bar."""
         if self.running:
-            self.message_queue.put(("status", message))
+            self.post("status", message)
 
-    def show_format_result(self, message):
-        """Show formatted text result."""
+    def show_format_result(self, message, partial=False):
+        """Show formatted text result (partial=True for streamed, in-progress text)."""
         if self.running:
-            self.message_queue.put(("format_result", message))
+            self.post("format_partial" if partial else "format_result", message)
 
     def _request_formatting(self):
         """Called by the GUI 'Format & Paste' button."""
         if self.current_text:
             format_type = self.format_var.get()
-            self.format_callback(self.current_text, format_type)
+            # The cache is shown only as its tail; let TextCache format all of it
+            text = None if self.showing_cache else self.current_text
+            # TextCache takes its lock and may post back to this thread; don't block Tk on it
+            threading.Thread(target=self.format_callback, args=(text, format_type), daemon=True).start()
         else:
             self.update_status("Nothing to format - cache is empty")
 
     def _request_raw_paste(self):
         """Called by the GUI 'Paste Raw' button."""
         if hasattr(self, "raw_paste_callback"):
-            self.raw_paste_callback()
+            threading.Thread(target=self.raw_paste_callback, daemon=True).start()
         else:
             self.update_status("Raw paste callback not set")
 
+    def _request_preview(self):
+        """Called by the GUI 'Preview All' button."""
+        if self.preview_callback:
+            # Submitting work and playing sounds shouldn't stall the Tk thread
+            threading.Thread(target=self.preview_callback, daemon=True).start()
+
+    def set_preview_callback(self, callback):
+        """Set callback for the 'Preview All' button."""
+        self.preview_callback = callback
+
+    def set_preview_paste_callback(self, callback):
+        """Set callback invoked with the style picked from the preview panel."""
+        self.preview_paste_callback = callback
+
     def set_raw_paste_callback(self, callback):
         """Set callback for raw paste button."""
         self.raw_paste_callback = callback
 
+    def set_format_change_callback(self, callback):
+        """Set callback invoked with the new format when the style selection changes."""
+        self.format_change_callback = callback
+
+    def _on_format_changed(self, *args):
+        """Tk variable trace for the format selector."""
+        if self.format_change_callback:
+            self.format_change_callback(self.format_var.get())
+
     def get_current_format(self):
         """Get currently selected format type."""
         return self.format_var.get()
@@ -479,6 +810,7 @@ class EnhancedNotification:
     def cleanup(self):
         """Clean up resources before exit."""
         self.running = False
+        self.history_store.close()
         if self.root:
             try:
                 self.root.quit()
@@ -0,0 +1,144 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from .config import default_cache_dir
+
+
+_STOP = object()
+
+
+# ---------------------------------------------------------------------
+# HISTORY STORE
+# ---------------------------------------------------------------------
+class HistoryStore:
+    """
+    Transcription history: the newest items in a bounded deque for the UI,
+    and every item in an append-only SQLite (WAL) archive.
+
+    add() never touches the database; a writer thread batches inserts. Older
+    items are read back a page at a time, so memory stays bounded no matter
+    how long the app runs.
+    """
+
+    def __init__(self, max_items=10, db_path=None, flush_interval=1.0, batch_size=100):
+        self.recent = deque(maxlen=max_items)
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._pending = queue.Queue()
+        self._writer = None
+        if db_path:
+            try:
+                self._init_db()
+                self.recent.extend(reversed(self.page(limit=max_items)))
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+            except sqlite3.Error as e:
+                print(f"[History] Archive unavailable ({e}); keeping history in memory only")
+                self.db_path = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a store from [ui] max_history_items and the [history] section."""
+        section = config.get("history", {})
+        db_path = None
+        if section.get("archive", True):
+            db_path = section.get("path") or os.path.join(default_cache_dir(), "history.sqlite3")
+        return cls(max_items=config["ui"]["max_history_items"], db_path=db_path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " timestamp REAL NOT NULL, kind TEXT NOT NULL, text TEXT NOT NULL)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add(self, text, kind="raw"):
+        """Record a history item; returns the in-memory item."""
+        item = {"text": text, "timestamp": time.time(), "kind": kind}
+        self.recent.append(item)
+        if self._writer is not None:
+            self._pending.put(item)
+        return item
+
+    def page(self, before_id=None, limit=50):
+        """
+        Archived items, newest first, with id < before_id. Pass the smallest id
+        of the previous page to walk further back.
+        """
+        if not self.db_path:
+            return []
+        conn = self._connect()
+        try:
+            if before_id is None:
+                rows = conn.execute(
+                    "SELECT id, timestamp, kind, text FROM history ORDER BY id DESC LIMIT ?",
+                    (limit,),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT id, timestamp, kind, text FROM history WHERE id < ?"
+                    " ORDER BY id DESC LIMIT ?",
+                    (before_id, limit),
+                ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {"id": row[0], "timestamp": row[1], "kind": row[2], "text": row[3]} for row in rows
+        ]
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                item = self._pending.get()
+                if item is _STOP:
+                    break
+
+                # Gather whatever else arrives within the flush window into one transaction
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                try:
+                    conn.executemany(
+                        "INSERT INTO history (timestamp, kind, text) VALUES (?, ?, ?)",
+                        [(i["timestamp"], i["kind"], i["text"]) for i in batch],
+                    )
+                    conn.commit()
+                except sqlite3.Error as e:
+                    print(f"[History] Failed to archive {len(batch)} items: {e}")
+        finally:
+            conn.close()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        if self._writer is not None:
+            self._pending.put(_STOP)
+            self._writer.join(timeout=5)
+            self._writer = None
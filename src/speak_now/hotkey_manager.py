@@ -1,5 +1,9 @@
+import threading
+
 import keyboard
 
+from .metrics import metrics
+
 # ---------------------------------------------------------------------
 # HOTKEY HANDLING
 # ---------------------------------------------------------------------
@@ -10,6 +14,8 @@ class HotkeyManager:
         self.hotkeys_registered = False
         self.recorder = None
         self.app = None  # Reference to main app
+        self.pick_hotkeys = []  # Preview pick hotkeys, registered only while a preview is open
+        self._pick_lock = threading.Lock()
 
     def _on_paste_raw(self):
         import keyboard
@@ -18,17 +24,49 @@ class HotkeyManager:
         self.text_cache.paste_and_clear()
         keyboard.release('ctrl')
 
+    def _on_paste_raw_hotkey(self):
+        metrics.mark("hotkey_paste_raw")
+        self.text_cache.paste_and_clear()
+
     def _on_paste_formatted(self):
         import keyboard
+        metrics.mark("hotkey_paste_formatted")
         # Force-release Alt in case it's stuck
         keyboard.release('alt')
         self.text_cache.format_and_paste()
 
+    def _on_preview_pick(self, number):
+        self.text_cache.paste_preview(number, before_paste=self._release_pick_modifiers)
+
+    def _release_pick_modifiers(self):
+        import keyboard
+        # Release the pick hotkey's modifiers so they don't combine with Ctrl+V
+        for key in self.config["hotkeys"]["preview_pick"].split("+")[:-1]:
+            keyboard.release(key)
+
+    def _on_preview_changed(self, preview):
+        """Hold alt+1, alt+2, ... only while a preview is open, leaving them to other apps otherwise."""
+        with self._pick_lock:
+            if preview is None:
+                hotkeys, self.pick_hotkeys = self.pick_hotkeys, []
+                for hotkey in hotkeys:
+                    try:
+                        keyboard.remove_hotkey(hotkey)
+                    except (KeyError, ValueError):
+                        pass  # Already gone with unhook_all()
+            elif not self.pick_hotkeys:
+                # "alt+{n}" -> alt+1 pastes the first previewed style, alt+2 the second, ...
+                pick = self.config["hotkeys"]["preview_pick"]
+                for number in range(1, min(len(preview.styles), 9) + 1):
+                    self.pick_hotkeys.append(
+                        keyboard.add_hotkey(pick.format(n=number), self._on_preview_pick, args=(number,))
+                    )
+
     def register_hotkeys(self):
         """Register keyboard hotkeys and return success status."""
         try:
             keyboard.add_hotkey(
-                self.config["hotkeys"]["paste_raw"], self.text_cache.paste_and_clear
+                self.config["hotkeys"]["paste_raw"], self._on_paste_raw_hotkey
             )
 
             keyboard.add_hotkey(
@@ -46,6 +84,20 @@ class HotkeyManager:
                     self.config["hotkeys"]["toggle_window"], self._toggle_window_visibility
                 )
 
+            if "cancel_format" in self.config["hotkeys"]:
+                keyboard.add_hotkey(
+                    self.config["hotkeys"]["cancel_format"], self.text_cache.cancel_format
+                )
+
+            if "preview_all" in self.config["hotkeys"]:
+                keyboard.add_hotkey(
+                    self.config["hotkeys"]["preview_all"], self.text_cache.preview_all_styles
+                )
+
+            # Pick hotkeys come and go with the style preview
+            if self.config["hotkeys"].get("preview_pick"):
+                self.text_cache.set_preview_change_callback(self._on_preview_changed)
+
             self.hotkeys_registered = True
             print(f"[Hotkeys] Successfully registered hotkeys")
             return True
@@ -83,6 +135,7 @@ class HotkeyManager:
         """Unregister all hotkeys."""
         try:
             keyboard.unhook_all()
+            self.pick_hotkeys = []
             self.hotkeys_registered = False
             print("[Hotkeys] Unregistered all hotkeys")
         except Exception as e:
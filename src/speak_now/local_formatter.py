@@ -0,0 +1,101 @@
+import re
+import time
+
+from .metrics import metrics
+
+
+# Styles mapped to this backend in [formatting_backends] are formatted in-process
+LOCAL_BACKEND = "local"
+GEMINI_BACKEND = "gemini"
+
+FILLER_WORDS = re.compile(r"(?<![\w'])(?:u+m+|u+h+m*|e+r+m+|h+m+)(?![\w'])[,.]?\s*", re.IGNORECASE)
+# "the the" -> "the"; a few words are legitimately doubled in English
+REPEATED_WORD = re.compile(r"\b(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+ALLOWED_REPEATS = {"had", "that", "is", "do", "very", "no", "so", "bye"}
+SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([,.;:!?])")
+REPEATED_PUNCTUATION = re.compile(r"([,;:!?])\1+|(?<!\.)\.\.(?!\.)")
+CLASHING_PUNCTUATION = re.compile(r"[,;:]+([.!?])")
+# A period after a lone letter is part of "U.S." or "e.g.", not a sentence end missing its space
+MISSING_SPACE = re.compile(r"(?<!\b[A-Za-z])([.!?])(?=[A-Z])|([,;:])(?=[A-Za-z])")
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Abbreviations a sentence doesn't end at: dotted letters ("U.S.", "e.g.", "a.m.") and common short forms
+ABBREVIATION_END = re.compile(
+    r"(?:\b(?:[A-Za-z]\.){2,}|\b(?:mr|mrs|ms|dr|prof|st|jr|sr|vs|etc|approx)\.)$", re.IGNORECASE
+)
+STANDALONE_I = re.compile(r"\bi\b(?=$|[\s,.;:!?']|'(?:m|ve|ll|d)\b)")
+
+QUESTION_STARTERS = {
+    "who", "what", "when", "where", "why", "how", "which", "whose",
+    "is", "are", "am", "was", "were", "do", "does", "did", "can", "could",
+    "will", "would", "should", "shall", "may", "might", "have", "has",
+}
+
+
+# ---------------------------------------------------------------------
+# LOCAL FORMATTER
+# ---------------------------------------------------------------------
+class LocalFormatter:
+    """
+    Rule-based cleanup that runs in-process with no network call: whitespace
+    and punctuation spacing, filler and repeated-word removal, sentence casing
+    and a closing punctuation mark guessed from the sentence's first word.
+    """
+
+    def __init__(self, remove_fillers=True):
+        self.remove_fillers = remove_fillers
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(remove_fillers=config["formatting"].get("local_remove_fillers", True))
+
+    def format(self, text):
+        start = time.perf_counter()
+        paragraphs = [self._format_paragraph(p) for p in re.split(r"\n\s*\n", text)]
+        formatted = "\n\n".join(p for p in paragraphs if p)
+        metrics.record("local_format", time.perf_counter() - start)
+        return formatted
+
+    def _format_paragraph(self, text):
+        text = " ".join(text.split())
+        if self.remove_fillers:
+            text = FILLER_WORDS.sub("", text)
+        text = REPEATED_WORD.sub(self._collapse_repeat, text)
+
+        text = SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+        text = REPEATED_PUNCTUATION.sub(lambda m: m.group(1) or ".", text)
+        text = CLASHING_PUNCTUATION.sub(r"\1", text)
+        text = MISSING_SPACE.sub(lambda m: (m.group(1) or m.group(2)) + " ", text)
+        text = STANDALONE_I.sub("I", text).strip(" ,;:")
+        if not text:
+            return ""
+
+        sentences = [self._capitalize(s) for s in self._split_sentences(text)]
+        last = sentences[-1]
+        if last[-1] not in ".!?\"')":
+            first_word = re.match(r"[\w']*", last).group(0).lower()
+            sentences[-1] = last + ("?" if first_word in QUESTION_STARTERS else ".")
+        return " ".join(sentences)
+
+    @staticmethod
+    def _split_sentences(text):
+        sentences = []
+        for piece in SENTENCE_SPLIT.split(text):
+            if not piece:
+                continue
+            if sentences and ABBREVIATION_END.search(sentences[-1]):
+                sentences[-1] += " " + piece
+            else:
+                sentences.append(piece)
+        return sentences
+
+    @staticmethod
+    def _collapse_repeat(match):
+        word = match.group(1)
+        return match.group(0) if word.lower() in ALLOWED_REPEATS else word
+
+    @staticmethod
+    def _capitalize(sentence):
+        for index, char in enumerate(sentence):
+            if char.isalpha():
+                return sentence[:index] + char.upper() + sentence[index + 1:]
+        return sentence
@@ -0,0 +1,255 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from .config import default_cache_dir
+
+
+# Upper bounds (seconds) of the fixed histogram buckets; one more bucket catches the rest
+BUCKET_BOUNDS = (
+    0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0,
+)
+
+
+# ---------------------------------------------------------------------
+# HISTOGRAM
+# ---------------------------------------------------------------------
+class Histogram:
+    """Fixed-bucket latency histogram; snapshots from different runs can be merged."""
+
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Estimated value at `fraction` (0-1), interpolated within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "bounds": list(self.bounds),
+            "buckets": list(self.counts),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        histogram = cls(snapshot["bounds"])
+        histogram.counts = list(snapshot["buckets"])
+        histogram.count = snapshot["count"]
+        histogram.total = snapshot["sum"]
+        histogram.max = snapshot["max"]
+        return histogram
+
+    def merge(self, other):
+        """Add another histogram with the same bounds into this one."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+# ---------------------------------------------------------------------
+# LATENCY METRICS
+# ---------------------------------------------------------------------
+class LatencyMetrics:
+    """
+    Named timing spans feeding histograms.
+
+    Use span() for work that starts and ends in one place, or mark() and
+    finish() for spans that start on one thread and end on another (e.g. a
+    hotkey press and the paste it triggers).
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._marks = {}
+        self._lock = threading.Lock()
+        self._samples = 0
+        self._reporter = None
+        self._stop_reporter = threading.Event()
+        self.session = uuid.uuid4().hex[:12]
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(seconds)
+            self._samples += 1
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def mark(self, name):
+        """Remember when something happened, to be closed later by finish()."""
+        self._marks[name] = time.perf_counter()
+
+    def finish(self, mark_name, span_name):
+        """Record the time since mark(mark_name) as span_name, if it was marked."""
+        start = self._marks.pop(mark_name, None)
+        if start is not None:
+            self.record(span_name, time.perf_counter() - start)
+
+    def percentile(self, name, fraction, min_count=1):
+        """Estimated percentile of a span, or None with fewer than min_count samples."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None or histogram.count < min_count:
+                return None
+            return histogram.percentile(fraction)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+    def start_reporter(self, path, interval=60.0):
+        """Append a snapshot line to a JSONL file every `interval` seconds with new samples."""
+        if self._reporter is not None:
+            return
+        self._stop_reporter.clear()
+        self._reporter = threading.Thread(
+            target=self._report_loop, args=(path, interval), name="metrics-reporter", daemon=True
+        )
+        self._reporter.start()
+
+    def _report_loop(self, path, interval):
+        written = 0
+        while True:
+            stopping = self._stop_reporter.wait(interval)
+            if self._samples != written:
+                written = self._samples
+                self.write_snapshot(path)
+            if stopping:
+                return
+
+    def write_snapshot(self, path):
+        line = {"timestamp": time.time(), "session": self.session, "spans": self.snapshot()}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line) + "\n")
+        except OSError as e:
+            print(f"[Metrics] Could not write {path}: {e}")
+
+    def stop_reporter(self):
+        """Write a final snapshot and stop the reporter thread."""
+        if self._reporter is not None:
+            self._stop_reporter.set()
+            self._reporter.join(timeout=2)
+            self._reporter = None
+
+
+# ---------------------------------------------------------------------
+# STARTUP PROFILER
+# ---------------------------------------------------------------------
+class StartupProfiler:
+    """Wall time and newly imported modules per startup phase (speak-now --profile-startup)."""
+
+    def __init__(self):
+        self.phases = []  # (name, seconds, modules imported)
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        modules = len(sys.modules)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - start, len(sys.modules) - modules))
+
+    def report(self):
+        total = time.perf_counter() - self._start
+        print(f"\nStartup profile ({total * 1000:.0f} ms since the CLI started)\n")
+        print(f"{'phase':<34}{'ms':>10}{'modules':>10}")
+        with self._lock:
+            for name, seconds, modules in self.phases:
+                print(f"{name:<34}{seconds * 1000:>10.1f}{modules:>10}")
+        print("\nPhases marked (background) overlap the others; module counts there are approximate.")
+
+
+# Global metrics registry shared by all components
+metrics = LatencyMetrics()
+
+
+def metrics_path(config):
+    """JSONL file the [metrics] section points at."""
+    return config.get("metrics", {}).get("path") or os.path.join(default_cache_dir(), "metrics.jsonl")
+
+
+def load_stats(path):
+    """Merge the latest snapshot of every session in a metrics file into one histogram per span."""
+    latest = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            latest[entry["session"]] = entry["spans"]
+
+    merged = {}
+    for spans in latest.values():
+        for name, snapshot in spans.items():
+            histogram = Histogram.from_snapshot(snapshot)
+            if name in merged:
+                merged[name].merge(histogram)
+            else:
+                merged[name] = histogram
+    return merged, len(latest)
+
+
+def print_stats(path):
+    """Print p50/p95/p99 per span from a metrics file (used by --stats)."""
+    if not os.path.exists(path):
+        print(f"No metrics recorded yet ({path} does not exist).")
+        return
+    merged, sessions = load_stats(path)
+    print(f"Latency stats from {path} ({sessions} session(s))\n")
+    print(f"{'span':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name in sorted(merged):
+        h = merged[name]
+        print(
+            f"{name:<28}{h.count:>8}{h.percentile(0.5) * 1000:>10.1f}"
+            f"{h.percentile(0.95) * 1000:>10.1f}{h.percentile(0.99) * 1000:>10.1f}"
+            f"{h.max * 1000:>10.1f}"
+        )
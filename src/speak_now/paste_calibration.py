@@ -0,0 +1,148 @@
+import statistics
+import threading
+import time
+
+
+# Text lengths timed for each strategy
+CALIBRATION_LENGTHS = (1, 8, 32, 96, 256)
+SAMPLE_TEXT = "the quick brown fox jumps over the lazy dog "
+# How long one paste may take to show up in the calibration window
+ARRIVAL_TIMEOUT = 5.0
+
+
+def sample_text(length):
+    return (SAMPLE_TEXT * (length // len(SAMPLE_TEXT) + 1))[:length]
+
+
+def fit_threshold(typed, clipboard):
+    """
+    Longest text worth typing, from {length: seconds} timings of both
+    strategies. Typing cost is fitted as a line in the text length; the
+    clipboard costs about the same at any length, so its median is used.
+    """
+    lengths = sorted(typed)
+    clipboard_cost = statistics.median(clipboard.values())
+    mean_length = statistics.fmean(lengths)
+    mean_cost = statistics.fmean(typed[n] for n in lengths)
+    spread = sum((n - mean_length) ** 2 for n in lengths)
+    per_char = sum((n - mean_length) * (typed[n] - mean_cost) for n in lengths) / spread
+    fixed = mean_cost - per_char * mean_length
+    if fixed >= clipboard_cost:
+        return 0
+    if per_char <= 0:
+        return lengths[-1]
+    # Never extrapolate past what was measured
+    return min(int((clipboard_cost - fixed) / per_char), lengths[-1])
+
+
+# ---------------------------------------------------------------------
+# CALIBRATION WINDOW
+# ---------------------------------------------------------------------
+class PasteCalibration:
+    """
+    Times both paste strategies end to end: from the call until the text
+    shows up in a focused Tk text box, so slow keystroke delivery counts.
+    The Tk loop runs on the calling thread and the pastes on a worker.
+    """
+
+    def __init__(self, engine, lengths=CALIBRATION_LENGTHS, repeats=3):
+        self.engine = engine
+        self.lengths = lengths
+        self.repeats = repeats
+        self.timings = {engine.typer.name: {}, engine.clipboard.name: {}}
+        self.error = None
+
+        self._expected = None
+        self._arrived = threading.Event()
+        self._clear = threading.Event()
+        self._cleared = threading.Event()
+
+    def run(self):
+        """Show the window, time every strategy and length, and return the fitted threshold."""
+        import tkinter as tk
+
+        self.root = tk.Tk()
+        self.root.title("Speak Now - paste calibration")
+        self.root.attributes("-topmost", True)
+        tk.Label(self.root, text="Calibrating paste speed. Keep this window focused.").pack(padx=10, pady=5)
+        self.text = tk.Text(self.root, width=60, height=8)
+        self.text.pack(padx=10, pady=5)
+        self.root.after(200, self._focus)
+        self.root.after(1, self._poll)
+
+        worker = threading.Thread(target=self._measure, name="paste-calibration", daemon=True)
+        worker.start()
+        self.root.mainloop()
+        self.root.destroy()
+        worker.join()
+        if self.error:
+            raise self.error
+
+        typed = {n: statistics.median(s) for n, s in self.timings[self.engine.typer.name].items()}
+        clipboard = {n: statistics.median(s) for n, s in self.timings[self.engine.clipboard.name].items()}
+        return fit_threshold(typed, clipboard), typed, clipboard
+
+    def _focus(self):
+        self.root.focus_force()
+        self.text.focus_set()
+
+    def _poll(self):
+        """Tk side: clear the box on request and report when the expected text is in it."""
+        if self._clear.is_set():
+            self._clear.clear()
+            self.text.delete("1.0", "end")
+            self._cleared.set()
+        expected = self._expected
+        if expected is not None and self.text.get("1.0", "end-1c") == expected:
+            self._expected = None
+            self._arrived.set()
+        self.root.after(1, self._poll)
+
+    def _measure(self):
+        try:
+            time.sleep(0.5)  # Let the window map and take focus
+            for strategy in (self.engine.typer, self.engine.clipboard):
+                for length in self.lengths:
+                    self.timings[strategy.name][length] = [
+                        self._time_paste(strategy, sample_text(length)) for _ in range(self.repeats)
+                    ]
+                    print(f"[Calibrate] {strategy.name:9} {length:4} chars: "
+                          f"{statistics.median(self.timings[strategy.name][length]) * 1000:.1f} ms")
+        except Exception as e:
+            self.error = e
+        finally:
+            self.root.after(0, self.root.quit)
+
+    def _time_paste(self, strategy, text):
+        self._cleared.clear()
+        self._clear.set()
+        if not self._cleared.wait(ARRIVAL_TIMEOUT):
+            raise RuntimeError("Calibration window stopped responding")
+
+        self._arrived.clear()
+        self._expected = text
+        start = time.perf_counter()
+        strategy.paste(text)
+        if not self._arrived.wait(ARRIVAL_TIMEOUT):
+            raise RuntimeError(
+                f"{strategy.name} paste of {len(text)} characters never arrived; "
+                "was the calibration window focused?"
+            )
+        return time.perf_counter() - start
+
+
+def calibrate_paste(config):
+    """Measure both paste strategies on this machine and save the chosen threshold."""
+    from .paste_engine import PasteEngine
+
+    engine = PasteEngine.from_config(config)
+    threshold, typed, clipboard = PasteCalibration(engine).run()
+    engine.calibrated_threshold = threshold
+    engine.close()
+
+    print(f"[Calibrate] Typing text up to {threshold} characters, clipboard above that")
+    if engine.type_threshold:
+        print(f"[Calibrate] Note: paste.type_threshold = {engine.type_threshold} in the config overrides this")
+    if engine.state_path is None:
+        print("[Calibrate] paste.persist is off, so the result is not saved")
+    return threshold
@@ -0,0 +1,321 @@
+import json
+import os
+import subprocess
+import threading
+import time
+
+from .clipboard import TextClipboard, clipboard_from_config
+from .config import default_cache_dir
+from .metrics import metrics
+
+
+# Never give up on the clipboard sooner than this, however fast it has been so far
+MIN_CONFIRM_WAIT = 0.02
+# Smoothing gains for the learned confirm time (the same ones TCP uses for RTT)
+SMOOTHING_GAIN = 0.125
+VARIANCE_GAIN = 0.25
+
+# [paste] strategy values
+AUTO = "auto"
+CLIPBOARD = "clipboard"
+TYPE = "type"
+# Longest text typed in "auto" mode until `speak-now --calibrate-paste` has measured this machine
+DEFAULT_TYPE_THRESHOLD = 24
+
+
+def _same_text(clipboard, text):
+    """Clipboards may convert line endings or drop a trailing newline on the way back."""
+    if clipboard is None:
+        return False
+    return clipboard.replace("\r\n", "\n").rstrip("\n") == text.replace("\r\n", "\n").rstrip("\n")
+
+
+def can_type(text):
+    """
+    Typing is only safe for plain ASCII on one line: a typed newline is an
+    Enter press (it sends chat messages), and characters missing from the
+    keyboard layout can't be typed reliably on every platform.
+    """
+    return text.isascii() and text.isprintable()
+
+
+# ---------------------------------------------------------------------
+# PASTE STRATEGIES
+# ---------------------------------------------------------------------
+class ClipboardPaste:
+    """
+    Pastes through the clipboard: save it, copy, wait until the clipboard
+    actually returns the new text, and send Ctrl+V.
+
+    Instead of a fixed sleep before the keystroke the clipboard is polled,
+    and the longest wait is learned from how fast it has confirmed on this
+    machine (smoothed time plus four deviations). A wait that runs out
+    doubles the next one.
+
+    The saved contents are put back by a background thread `restore_delay`
+    after the keystroke, so paste() returns right after Ctrl+V. A paste
+    that comes before the restore reuses the saved contents and pushes the
+    restore back, so back-to-back pastes restore once.
+    """
+
+    name = CLIPBOARD
+
+    def __init__(self, confirm_timeout=0.25, poll_interval=0.002, restore_delay=0.03, clipboard=None):
+        self.confirm_timeout = confirm_timeout  # Upper bound on the learned wait
+        self.poll_interval = poll_interval
+        self.restore_delay = restore_delay
+        self.clipboard = clipboard or TextClipboard()
+
+        self._lock = threading.Lock()
+        self.smoothed = None  # Smoothed copy -> confirmed time
+        self.deviation = 0.0
+        self.backoff = 1.0  # Doubles per unconfirmed paste, reset by a confirmed one
+        self.confirmed = 0
+        self.unconfirmed = 0
+
+        # Held from saving the clipboard to the keystroke, and while restoring it
+        self._clipboard_lock = threading.Lock()
+        self._restore_ready = threading.Condition()
+        self._pending = None  # Snapshot waiting to be restored
+        self._restore_at = 0.0
+        self._closed = False
+        self.restores = 0
+        self.coalesced = 0  # Pastes that reused a snapshot still waiting to be restored
+        self._restorer = threading.Thread(target=self._restore_loop, name="clipboard-restore", daemon=True)
+        self._restorer.start()
+
+    def confirm_wait(self):
+        """Longest time to wait for the clipboard before pasting anyway."""
+        with self._lock:
+            if self.smoothed is None:
+                return self.confirm_timeout
+            wait = (self.smoothed + 4 * self.deviation) * self.backoff
+        return min(max(wait, MIN_CONFIRM_WAIT), self.confirm_timeout)
+
+    def paste(self, text):
+        """Paste text into the focused window; the clipboard is restored in the background."""
+        import keyboard
+
+        with self._clipboard_lock:
+            with self._restore_ready:
+                original = self._pending
+            if original is None:
+                original = self.clipboard.capture()
+            else:
+                # Still holds our previous paste; the saved contents are the real ones
+                self.coalesced += 1
+
+            clipboard_set_at = time.perf_counter()
+            self.clipboard.set_text(text)
+            self._wait_for_clipboard(text, clipboard_set_at)
+
+            keyboard.press_and_release("ctrl+v")
+            pasted_at = time.perf_counter()
+            metrics.record("clipboard_to_ctrl_v", pasted_at - clipboard_set_at)
+
+            with self._restore_ready:
+                self._pending = original
+                # The target window reads the clipboard on its own schedule after the keystroke
+                self._restore_at = pasted_at + self.restore_delay
+                self._restore_ready.notify()
+
+    def _restore_loop(self):
+        while True:
+            with self._restore_ready:
+                while self._pending is None and not self._closed:
+                    self._restore_ready.wait()
+                if self._closed:
+                    return  # close() restores whatever is left
+                delay = self._restore_at - time.perf_counter()
+                if delay > 0:
+                    self._restore_ready.wait(delay)
+                    continue  # Another paste may have pushed the restore back
+
+            with self._clipboard_lock:
+                with self._restore_ready:
+                    if time.perf_counter() < self._restore_at:
+                        continue  # A paste got the lock first
+                    snapshot, self._pending = self._pending, None
+                if snapshot is not None:
+                    self._restore(snapshot)
+
+    def _restore(self, snapshot):
+        start = time.perf_counter()
+        try:
+            self.clipboard.restore(snapshot)
+            self.restores += 1
+        except Exception as e:
+            print(f"[Paste] Could not restore the clipboard: {e}")
+        metrics.record("clipboard_restore", time.perf_counter() - start)
+
+    def close(self):
+        """Stop the restore thread, restoring a pending snapshot right away."""
+        with self._restore_ready:
+            self._closed = True
+            self._restore_ready.notify()
+        self._restorer.join(timeout=5)
+        with self._clipboard_lock:
+            snapshot, self._pending = self._pending, None
+            if snapshot is not None:
+                self._restore(snapshot)
+        self.clipboard.close()
+
+    def _wait_for_clipboard(self, text, clipboard_set_at):
+        deadline = clipboard_set_at + self.confirm_wait()
+        while True:
+            if _same_text(self.clipboard.get_text(), text):
+                self._learn(time.perf_counter() - clipboard_set_at)
+                return True
+            if time.perf_counter() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+
+        waited = time.perf_counter() - clipboard_set_at
+        metrics.record("clipboard_confirm_timeout", waited)
+        print(f"[Paste] Clipboard not confirmed after {waited * 1000:.0f} ms; pasting anyway")
+        with self._lock:
+            self.unconfirmed += 1
+            self.backoff = min(self.backoff * 2, 64.0)
+        return False
+
+    def _learn(self, elapsed):
+        metrics.record("clipboard_confirm", elapsed)
+        with self._lock:
+            self.confirmed += 1
+            self.backoff = 1.0
+            if self.smoothed is None:
+                self.smoothed, self.deviation = elapsed, elapsed / 2
+            else:
+                self.deviation += VARIANCE_GAIN * (abs(elapsed - self.smoothed) - self.deviation)
+                self.smoothed += SMOOTHING_GAIN * (elapsed - self.smoothed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "confirmed": self.confirmed,
+                "unconfirmed": self.unconfirmed,
+                "smoothed_ms": None if self.smoothed is None else round(self.smoothed * 1000, 2),
+                "deviation_ms": round(self.deviation * 1000, 2),
+                "restores": self.restores,
+                "coalesced": self.coalesced,
+            }
+
+
+class TypedPaste:
+    """Types text as keystrokes, leaving the clipboard alone."""
+
+    name = TYPE
+
+    def __init__(self, backend="keyboard"):
+        self.backend = backend  # "keyboard" or "xdotool" (X11 only)
+
+    def paste(self, text):
+        if self.backend == "xdotool":
+            # Without --clearmodifiers a still-held hotkey modifier turns the typed text into shortcuts
+            subprocess.run(["xdotool", "type", "--clearmodifiers", "--delay", "0", "--", text], check=True)
+        else:
+            import keyboard
+
+            keyboard.write(text)
+
+
+# ---------------------------------------------------------------------
+# PASTE ENGINE
+# ---------------------------------------------------------------------
+class PasteEngine:
+    """
+    Chooses how each text gets into the focused window. In "auto" mode text
+    up to `type_threshold` characters is typed and longer text goes through
+    the clipboard; the threshold comes from --calibrate-paste, which times
+    both strategies on this machine. Learned timings and the calibrated
+    threshold are kept across restarts.
+    """
+
+    def __init__(self, clipboard=None, typer=None, strategy=AUTO, type_threshold=0, state_path=None):
+        self.clipboard = clipboard or ClipboardPaste()
+        self.typer = typer or TypedPaste()
+        self.strategy = strategy
+        self.type_threshold = type_threshold  # Set in the config; 0 = calibrated or default
+        self.calibrated_threshold = None
+        self.state_path = state_path
+        if state_path:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build an engine from the [paste] section of the app config."""
+        section = config.get("paste", {})
+        state_path = None
+        if section.get("persist", True):
+            state_path = section.get("path") or os.path.join(default_cache_dir(), "paste_timings.json")
+        clipboard = ClipboardPaste(
+            confirm_timeout=section.get("confirm_timeout", 0.25),
+            poll_interval=section.get("poll_interval", 0.002),
+            restore_delay=section.get("restore_delay", 0.03),
+            clipboard=clipboard_from_config(config),
+        )
+        return cls(
+            clipboard=clipboard,
+            typer=TypedPaste(section.get("type_backend", "keyboard")),
+            strategy=section.get("strategy", AUTO),
+            type_threshold=section.get("type_threshold", 0),
+            state_path=state_path,
+        )
+
+    def threshold(self):
+        """Longest text typed in "auto" mode."""
+        if self.type_threshold:
+            return self.type_threshold
+        if self.calibrated_threshold is not None:
+            return self.calibrated_threshold
+        return DEFAULT_TYPE_THRESHOLD
+
+    def strategy_for(self, text):
+        if not can_type(text) or self.strategy == CLIPBOARD:
+            return self.clipboard
+        if self.strategy == TYPE or len(text) <= self.threshold():
+            return self.typer
+        return self.clipboard
+
+    def paste(self, text):
+        """Paste text into the focused window."""
+        strategy = self.strategy_for(text)
+        start = time.perf_counter()
+        strategy.paste(text)
+        elapsed = time.perf_counter() - start
+        metrics.record("paste_operation", elapsed)
+        metrics.record(f"paste_{strategy.name}", elapsed)
+
+    def stats(self):
+        stats = self.clipboard.stats()
+        stats["type_threshold"] = self.threshold() if self.strategy == AUTO else self.strategy
+        return stats
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.clipboard.smoothed = state.get("smoothed")
+            self.clipboard.deviation = state.get("deviation", 0.0)
+            self.calibrated_threshold = state.get("type_threshold")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"[Paste] Ignoring learned timings in {self.state_path}: {e}")
+
+    def close(self):
+        """Restore the clipboard if a paste left it changed, and save the learned timings."""
+        self.clipboard.close()
+        if not self.state_path:
+            return
+        state = {
+            "smoothed": self.clipboard.smoothed,
+            "deviation": self.clipboard.deviation,
+            "type_threshold": self.calibrated_threshold,
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+        except OSError as e:
+            print(f"[Paste] Could not save learned timings to {self.state_path}: {e}")
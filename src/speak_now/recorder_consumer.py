@@ -0,0 +1,69 @@
+import threading
+
+
+# ---------------------------------------------------------------------
+# RECORDER CONSUMER
+# ---------------------------------------------------------------------
+class RecorderConsumer:
+    """
+    Dedicated thread that hands recognized utterances to a callback.
+
+    While listening it blocks inside recorder.text(); while muted (or with no
+    recorder) it sleeps on a condition variable until notify() or stop() is
+    called. There are no fixed sleeps, so an idle app doesn't wake the CPU.
+    """
+
+    def __init__(self, can_listen, get_recorder, on_text):
+        self.can_listen = can_listen  # () -> bool: recording enabled and recorder ready
+        self.get_recorder = get_recorder  # () -> recorder or None
+        self.on_text = on_text  # (text) -> None
+
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """Start the consumer thread."""
+        self._thread = threading.Thread(target=self._run, name="recorder-consumer", daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        """Wake the consumer after mute, unmute or recorder changes."""
+        with self._condition:
+            self._condition.notify_all()
+
+    def stop(self, timeout=2.0):
+        """Ask the consumer to exit; the caller must unblock recorder.text() (abort/shutdown)."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopping and not self.can_listen():
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                recorder = self.get_recorder()
+
+            try:
+                # Blocks until an utterance is recognized or the recorder is aborted
+                text = recorder.text()
+            except Exception as e:
+                if self._stopping:
+                    return
+                print(f"[Recorder] Error while waiting for speech: {e}")
+                # The recorder may have been shut down; wait for the next state change
+                with self._condition:
+                    if not self._stopping and recorder is self.get_recorder():
+                        self._condition.wait()
+                continue
+
+            if text and not self._stopping and self.can_listen():
+                self.on_text(text)
@@ -0,0 +1,88 @@
+import time
+from collections import deque, namedtuple
+
+
+Segment = namedtuple("Segment", ["seq", "text", "timestamp"])
+
+
+# ---------------------------------------------------------------------
+# SEGMENT BUFFER
+# ---------------------------------------------------------------------
+class SegmentBuffer:
+    """
+    Dictated text kept as a list of timestamped utterances.
+
+    Appending is O(1) and word/char counts are maintained incrementally, so
+    per-utterance cost stays flat however long the session runs. Every
+    mutation bumps `generation`, which makes "has the cache changed since I
+    looked?" an integer comparison. Each segment also carries a sequence
+    number so a consumer can drop exactly the segments it snapshotted.
+    """
+
+    def __init__(self):
+        self.segments = deque()
+        self.word_count = 0
+        self.char_count = 0  # Length of text(), including separators
+        self.generation = 0
+        self._next_seq = 1
+        self._joined = ""
+        self._joined_generation = 0
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __bool__(self):
+        return self.word_count > 0
+
+    @property
+    def last_seq(self):
+        """Sequence number of the newest segment (0 if none were ever added)."""
+        return self._next_seq - 1
+
+    def append(self, text, timestamp=None):
+        """Add one recognized utterance."""
+        segment = Segment(self._next_seq, text, timestamp if timestamp is not None else time.time())
+        self._next_seq += 1
+        self.segments.append(segment)
+        self.word_count += len(text.split())
+        self.char_count += len(text) + 1
+        self.generation += 1
+        return segment
+
+    def text(self):
+        """The whole buffer as one string (joined lazily, at most once per generation)."""
+        if self._joined_generation != self.generation:
+            self._joined = "".join(segment.text + " " for segment in self.segments)
+            self._joined_generation = self.generation
+        return self._joined
+
+    def tail(self, max_chars):
+        """The last `max_chars` characters of text(), touching only the newest segments."""
+        if self._joined_generation == self.generation:
+            return self._joined[-max_chars:]
+        pieces = []
+        length = 0
+        for segment in reversed(self.segments):
+            pieces.append(segment.text + " ")
+            length += len(segment.text) + 1
+            if length >= max_chars:
+                break
+        return "".join(reversed(pieces))[-max_chars:]
+
+    def drop_through(self, seq):
+        """Remove segments up to and including `seq`; later segments stay."""
+        changed = False
+        while self.segments and self.segments[0].seq <= seq:
+            segment = self.segments.popleft()
+            self.word_count -= len(segment.text.split())
+            self.char_count -= len(segment.text) + 1
+            changed = True
+        if changed:
+            self.generation += 1
+
+    def clear(self):
+        """Remove every segment."""
+        self.segments.clear()
+        self.word_count = 0
+        self.char_count = 0
+        self.generation += 1
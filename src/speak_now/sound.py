@@ -0,0 +1,357 @@
+import os
+import json
+import time
+import queue
+import hashlib
+import threading
+import pyaudio
+import numpy as np
+
+
+# ---------------------------------------------------------------------
+# SOUND ENGINE
+# ---------------------------------------------------------------------
+class MinimalSoundEngine:
+    """Modern, minimalist sound engine with subtle, elegant feedback tones."""
+    
+    def __init__(self):
+        self.sample_rate = 48000  # Higher sample rate for cleaner sound
+        self.p = pyaudio.PyAudio()
+    
+    def _apply_envelope(self, audio, attack=0.01, release=0.01):
+        """Apply smooth attack and release envelope."""
+        total_samples = len(audio)
+        attack_samples = int(attack * self.sample_rate)
+        release_samples = int(release * self.sample_rate)
+        
+        # Create smooth envelope using half-cosine windows for more elegant transitions
+        envelope = np.ones(total_samples)
+        if attack_samples > 0:
+            envelope[:attack_samples] = (1 - np.cos(np.linspace(0, np.pi, attack_samples))) / 2
+        if release_samples > 0:
+            envelope[-release_samples:] = (1 + np.cos(np.linspace(0, np.pi, release_samples))) / 2
+            
+        return audio * envelope
+    
+    def sine(self, frequency, duration, volume=0.3, attack=0.008, release=0.015):
+        """Generate a clean sine wave with smooth envelope."""
+        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
+        tone = np.sin(2 * np.pi * frequency * t)
+        tone = self._apply_envelope(tone, attack, release)
+        tone *= volume
+        return (tone * 32767).astype(np.int16)
+    
+    def synth_tone(self, frequency, duration, volume=0.25, harmonics=None, attack=0.01, release=0.02):
+        """Generate a richer tone with harmonics for more sophisticated sound."""
+        if harmonics is None:
+            # Default harmonic structure for a warm, pleasant tone
+            harmonics = [(1.0, 1.0), (2.0, 0.15), (3.0, 0.05)]
+            
+        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
+        tone = np.zeros_like(t)
+        
+        # Add fundamental and harmonics
+        for harmonic_ratio, amplitude in harmonics:
+            tone += amplitude * np.sin(2 * np.pi * (frequency * harmonic_ratio) * t)
+        
+        # Normalize
+        tone = tone / max(abs(tone))
+        tone = self._apply_envelope(tone, attack, release)
+        tone *= volume
+        return (tone * 32767).astype(np.int16)
+    
+    def glass_tone(self, frequency, duration, volume=0.25, attack=0.004, release=0.08):
+        """Creates a clean, glass-like tone - modern and understated."""
+        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
+        
+        # Create a tone that mimics striking glass
+        tone = np.sin(2 * np.pi * frequency * t)
+        
+        # Add a subtle higher frequency component
+        tone += 0.1 * np.sin(2 * np.pi * frequency * 2.997 * t)
+        
+        # Add very subtle noise at the attack for realism
+        noise_duration = int(0.01 * self.sample_rate)
+        if noise_duration > 0:
+            noise = np.random.uniform(-0.02, 0.02, noise_duration)
+            noise = np.pad(noise, (0, len(tone) - len(noise)), 'constant')
+            tone += noise
+            
+        tone = self._apply_envelope(tone, attack, release)
+        tone *= volume
+        return (tone * 32767).astype(np.int16)
+    
+    def multi_tone(self, frequencies, duration, volume=0.3, relative_volumes=None, attack=0.01, release=0.02):
+        """Play multiple frequencies simultaneously with balanced volumes."""
+        if relative_volumes is None:
+            relative_volumes = [1.0] * len(frequencies)
+            
+        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
+        tone = np.zeros_like(t)
+        
+        # Add each frequency component
+        for i, freq in enumerate(frequencies):
+            rel_vol = relative_volumes[i] if i < len(relative_volumes) else 1.0
+            tone += rel_vol * np.sin(2 * np.pi * freq * t)
+            
+        # Normalize
+        max_val = max(abs(tone))
+        if max_val > 0:
+            tone = tone / max_val
+            
+        tone = self._apply_envelope(tone, attack, release)
+        tone *= volume
+        return (tone * 32767).astype(np.int16)
+    
+    def play(self, audio_data):
+        """Play audio through speakers."""
+        stream = self.p.open(format=pyaudio.paInt16, 
+                             channels=1, 
+                             rate=self.sample_rate, 
+                             output=True)
+        stream.write(audio_data.tobytes())
+        stream.stop_stream()
+        stream.close()
+    
+    def close(self):
+        """Clean up PyAudio resources."""
+        self.p.terminate()
+
+
+# ---------------------------------------------------------------------
+# SOUND BANK
+# ---------------------------------------------------------------------
+# Modern UI scale frequencies - based on pentatonic scale for pleasant harmony
+# These align better with the sleek, modern aesthetic of the CSS
+# D4, F#4, A4, B4, D5 pentatonic notes (587.33, 739.99, 880.00, 987.77, 1174.66 Hz)
+#
+# Each cue is a list of (generator, kwargs, gap_after) parts. The "volume" in
+# kwargs is relative to the volume passed to play_sound().
+SOUND_CUES = {
+    # Elegant startup sound sequence using glass tones
+    "startup": [
+        ("glass_tone", {"frequency": 587.33, "duration": 0.08, "volume": 0.8, "attack": 0.005}, 0.02),
+        ("glass_tone", {"frequency": 739.99, "duration": 0.08, "volume": 0.85, "attack": 0.004}, 0.02),
+        ("glass_tone", {"frequency": 880.00, "duration": 0.12, "volume": 0.9, "attack": 0.003, "release": 0.1}, 0.0),
+    ],
+    # Subtle, clean notification
+    "text_added": [
+        ("sine", {"frequency": 1174.66, "duration": 0.07, "volume": 0.6, "attack": 0.004, "release": 0.06}, 0.0),
+    ],
+    # Minimal processing indicator
+    "processing": [
+        ("glass_tone", {"frequency": 739.99, "duration": 0.05, "volume": 0.4, "attack": 0.003, "release": 0.04}, 0.0),
+    ],
+    # Two harmonious notes for paste action
+    "paste_raw": [
+        ("synth_tone", {"frequency": 587.33, "duration": 0.1, "volume": 0.6,
+                        "harmonics": [(1.0, 1.0), (2.0, 0.08), (3.0, 0.03)],
+                        "attack": 0.005, "release": 0.08}, 0.0),
+    ],
+    # More sophisticated paste formatted sound with multiple tones
+    "paste_formatted": [
+        ("multi_tone", {"frequencies": [739.99, 987.77], "duration": 0.12, "volume": 0.6,
+                        "relative_volumes": [1.0, 0.7], "attack": 0.008, "release": 0.1}, 0.0),
+    ],
+    # Subtle but clear error indication using minor notes (C#5, E5 - minor third interval)
+    "error": [
+        ("multi_tone", {"frequencies": [554.37, 659.25], "duration": 0.15, "volume": 0.5,
+                        "relative_volumes": [0.7, 1.0], "attack": 0.004, "release": 0.12}, 0.0),
+    ],
+    # Clean toggle sound - now replaced with mute/unmute
+    "toggle_recording": [
+        ("glass_tone", {"frequency": 880.00, "duration": 0.08, "volume": 0.6, "attack": 0.003, "release": 0.07}, 0.0),
+    ],
+    # Darker, lower tone for muting (C5, G4 - downward interval)
+    "mute": [
+        ("multi_tone", {"frequencies": [523.25, 392.00], "duration": 0.10, "volume": 0.55,
+                        "relative_volumes": [0.9, 1.0], "attack": 0.005, "release": 0.09}, 0.0),
+    ],
+    # Brighter, higher tone for unmuting (F5, C6 - upward interval)
+    "unmute": [
+        ("multi_tone", {"frequencies": [698.46, 1046.50], "duration": 0.10, "volume": 0.55,
+                        "relative_volumes": [1.0, 0.7], "attack": 0.005, "release": 0.08}, 0.0),
+    ],
+}
+
+# Bump when the synthesis code changes so stale on-disk renders are ignored
+SOUND_BANK_VERSION = 1
+
+
+class SoundBank:
+    """Renders every named cue once and serves the int16 buffers from memory.
+
+    Renders are also stored on disk, keyed by a hash of the cue parameters,
+    so later startups skip synthesis entirely.
+    """
+
+    def __init__(self, engine, cues=None, cache_dir=None):
+        self.engine = engine
+        self.cues = cues if cues is not None else SOUND_CUES
+        self.cache_dir = cache_dir
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def cache_key(self, sound_type, volume):
+        """Stable hash of everything that affects the rendered waveform."""
+        payload = json.dumps(
+            {
+                "version": SOUND_BANK_VERSION,
+                "sample_rate": self.engine.sample_rate,
+                "cue": sound_type,
+                "parts": self.cues[sound_type],
+                "volume": round(volume, 4),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def render(self, sound_type, volume=0.5):
+        """Synthesize a cue from scratch (the slow path)."""
+        pieces = []
+        for generator, kwargs, gap in self.cues[sound_type]:
+            kwargs = dict(kwargs, volume=kwargs.get("volume", 1.0) * volume)
+            pieces.append(getattr(self.engine, generator)(**kwargs))
+            if gap > 0:
+                pieces.append(np.zeros(int(gap * self.engine.sample_rate), dtype=np.int16))
+        return np.concatenate(pieces) if len(pieces) > 1 else pieces[0]
+
+    def _load_or_render(self, sound_type, volume):
+        path = None
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{self.cache_key(sound_type, volume)}.npy")
+            try:
+                return np.load(path)
+            except (OSError, ValueError):
+                pass
+
+        audio = self.render(sound_type, volume)
+
+        if path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, audio)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"[Sound] Could not write sound cache: {e}")
+        return audio
+
+    def get(self, sound_type, volume=0.5):
+        """Return the pre-rendered buffer for a cue, or None for unknown cues."""
+        key = (sound_type, round(volume, 4))
+        audio = self._buffers.get(key)
+        if audio is None:
+            if sound_type not in self.cues:
+                return None
+            with self._lock:
+                audio = self._buffers.get(key)
+                if audio is None:
+                    audio = self._load_or_render(sound_type, volume)
+                    self._buffers[key] = audio
+        return audio
+
+    def prerender(self, volume=0.5):
+        """Render (or load) every known cue at the given volume."""
+        for sound_type in self.cues:
+            self.get(sound_type, volume)
+
+
+# ---------------------------------------------------------------------
+# AUDIO MIXER
+# ---------------------------------------------------------------------
+class AudioMixer:
+    """Mixes queued cues into a single, persistent callback-mode output stream.
+
+    Callers only enqueue a pre-rendered buffer, so submitting a cue never
+    touches the audio device. PortAudio's callback thread drains the queue,
+    drops cues that waited longer than ``max_latency`` seconds and sums the
+    overlapping voices into each output block.
+    """
+
+    def __init__(self, engine, max_latency=0.25, max_voices=8, frames_per_buffer=512):
+        self.engine = engine
+        self.max_latency = max_latency
+        self.max_voices = max_voices
+        self.frames_per_buffer = frames_per_buffer
+        self.cue_queue = queue.Queue()
+        self.dropped = 0
+
+        self._voices = []  # [audio, position] pairs, owned by the callback thread
+        self._silence = {}
+        self._stream = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Open the output stream once; later calls are no-ops."""
+        with self._lock:
+            if self._stream is not None or self._failed:
+                return self._stream is not None
+            try:
+                self._stream = self.engine.p.open(
+                    format=pyaudio.paInt16,
+                    channels=1,
+                    rate=self.engine.sample_rate,
+                    output=True,
+                    frames_per_buffer=self.frames_per_buffer,
+                    stream_callback=self._callback,
+                )
+                self._stream.start_stream()
+            except Exception as e:
+                # Don't retry on every cue if there is no usable output device
+                self._failed = True
+                self._stream = None
+                print(f"[Sound] Could not open output stream: {e}")
+            return self._stream is not None
+
+    def submit(self, audio_data):
+        """Queue a buffer for playback and return immediately."""
+        if self._stream is None and not self.start():
+            return
+        self.cue_queue.put_nowait((time.monotonic(), audio_data))
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        now = time.monotonic()
+        while True:
+            try:
+                queued_at, audio = self.cue_queue.get_nowait()
+            except queue.Empty:
+                break
+            if now - queued_at > self.max_latency:
+                self.dropped += 1
+                continue
+            self._voices.append([audio, 0])
+
+        if len(self._voices) > self.max_voices:
+            self.dropped += len(self._voices) - self.max_voices
+            del self._voices[: -self.max_voices]
+
+        if not self._voices:
+            silence = self._silence.get(frame_count)
+            if silence is None:
+                silence = self._silence[frame_count] = bytes(2 * frame_count)
+            return (silence, pyaudio.paContinue)
+
+        mix = np.zeros(frame_count, dtype=np.int32)
+        for voice in self._voices:
+            audio, position = voice
+            chunk = audio[position : position + frame_count]
+            mix[: len(chunk)] += chunk
+            voice[1] = position + frame_count
+        self._voices = [voice for voice in self._voices if voice[1] < len(voice[0])]
+
+        np.clip(mix, -32768, 32767, out=mix)
+        return (mix.astype(np.int16).tobytes(), pyaudio.paContinue)
+
+    def close(self):
+        """Stop and close the output stream."""
+        with self._lock:
+            if self._stream is not None:
+                try:
+                    self._stream.stop_stream()
+                    self._stream.close()
+                except Exception as e:
+                    print(f"[Sound] Error closing output stream: {e}")
+                self._stream = None
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import deque
+
+
+# ---------------------------------------------------------------------
+# SPECULATIVE PRE-FORMATTING
+# ---------------------------------------------------------------------
+class SpeculativeFormatter:
+    """
+    Formats the cache in the background once dictation goes quiet, so
+    Format & Paste can use a result that is already in the format cache.
+
+    New speech or a style change invalidates the pending speculation, and
+    speculative API calls are capped per minute.
+    """
+
+    def __init__(self, text_cache, debounce=1.5, max_calls_per_minute=4):
+        self.text_cache = text_cache
+        self.debounce = debounce
+        self.max_calls_per_minute = max_calls_per_minute
+
+        self._lock = threading.Lock()
+        self._timer = None
+        self._cancel_event = None  # Set to invalidate the speculation in flight
+        self._recent_calls = deque()
+
+    @classmethod
+    def from_config(cls, text_cache, config):
+        """Return a formatter for the [speculative] section, or None if disabled."""
+        section = config.get("speculative", {})
+        if not section.get("enabled", False):
+            return None
+        return cls(
+            text_cache,
+            debounce=section.get("debounce", 1.5),
+            max_calls_per_minute=section.get("max_calls_per_minute", 4),
+        )
+
+    def schedule(self):
+        """(Re)start the quiet-period timer; called whenever new speech arrives."""
+        with self._lock:
+            self._invalidate_locked()
+            self._timer = threading.Timer(self.debounce, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def invalidate(self):
+        """Drop any pending or in-flight speculation."""
+        with self._lock:
+            self._invalidate_locked()
+
+    def _invalidate_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def _take_budget(self):
+        """Return True if another speculative call fits in the per-minute cap."""
+        now = time.monotonic()
+        while self._recent_calls and now - self._recent_calls[0] > 60:
+            self._recent_calls.popleft()
+        if len(self._recent_calls) >= self.max_calls_per_minute:
+            return False
+        self._recent_calls.append(now)
+        return True
+
+    def _fire(self):
+        with self._lock:
+            self._timer = None
+            cancel_event = self._cancel_event = threading.Event()
+
+        try:
+            self.text_cache.format_executor.submit(self._run, cancel_event)
+        except RuntimeError:
+            pass  # Executor already shut down
+
+    def _run(self, cancel_event):
+        text_cache = self.text_cache
+        text, format_type = text_cache.speculation_snapshot()
+        if not text or format_type == "None" or cancel_event.is_set():
+            return
+
+        def compute():
+            with self._lock:
+                allowed = self._take_budget()
+            if not allowed:
+                print("[Speculative] Call cap reached, skipping pre-format")
+                return None
+            print(f"[Speculative] Pre-formatting {len(text)} chars as {format_type}")
+            formatted = text_cache.format_text(text, format_type)
+            # A result for stale text is useless; don't let it occupy the cache
+            return None if cancel_event.is_set() else formatted
+
+        try:
+            text_cache.format_cache.get_or_compute(
+                text_cache.format_cache_key(text, format_type), compute
+            )
+        except Exception as e:
+            print(f"[Speculative] Pre-format failed: {e}")
+
+    def close(self):
+        """Stop timers and abandon in-flight speculation."""
+        self.invalidate()
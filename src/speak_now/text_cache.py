@@ -1,39 +1,209 @@
-import pyperclip
-import pyautogui
 import threading
 import time
 import os
-from .utils import generate_gemini
-
-from .gui_notification import EnhancedNotification
+import re
+from concurrent.futures import ThreadPoolExecutor
+from .gemini_client import GeminiClient, DeadlineExceeded
+from .format_cache import FormatCache
+from .local_formatter import LocalFormatter, LOCAL_BACKEND, GEMINI_BACKEND
+from .paste_engine import PasteEngine
+from .speculative import SpeculativeFormatter
+from .segment_buffer import SegmentBuffer
+from .metrics import metrics
 from .utils import play_sound
 
 
+# Characters of the cache the window displays
+DISPLAY_CHARS = 200
+
+# Sentence end (optionally followed by closing quotes/brackets) plus whitespace,
+# or a line break
+SENTENCE_BOUNDARY = re.compile(r"[.!?\u2026\u3002\uff01\uff1f][\"')\]]*\s+|\n")
+
+
+def split_complete_sentences(text):
+    """Split text into (complete sentences, unfinished remainder)."""
+    end = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        end = match.end()
+    return text[:end], text[end:]
+
+
+PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+WHITESPACE = re.compile(r"\s+")
+
+# Prepended to every chunk after the first when a long text is formatted in parts
+CHUNK_CONTEXT_PROMPT = (
+    "This is part {index} of {total} of a longer transcription. For context only (do not "
+    "include it in your answer), the previous part ended with: \"{context}\"\n\n"
+)
+
+
+def split_into_chunks(text, max_chars):
+    """
+    Split text into [(joiner, chunk)] pieces of about max_chars, cutting at
+    paragraph breaks where possible and otherwise at sentence ends. A sentence
+    longer than max_chars is cut at whitespace, or anywhere if it has none.
+    `joiner` is the separator to put back before the chunk ("" for the first).
+    """
+    chunks, current, joiner = [], "", ""
+    for paragraph in PARAGRAPH_BOUNDARY.split(text.strip()):
+        sentences, start = [], 0
+        for match in SENTENCE_BOUNDARY.finditer(paragraph):
+            sentences.append(paragraph[start:match.end()])
+            start = match.end()
+        sentences.append(paragraph[start:])
+
+        for sentence in sentences:
+            used = len(current) if current.strip() else 0
+            for piece in _cut_long_sentence(sentence, max_chars, used):
+                if current.strip() and len(current) + len(piece) > max_chars:
+                    chunks.append((joiner, current.strip()))
+                    # A hard cut inside a word must be rejoined without a space
+                    current, joiner = "", " " if current[-1].isspace() else ""
+                current += piece
+        # A paragraph end is a better cut than the middle of the next paragraph
+        if len(current) >= max_chars // 2:
+            chunks.append((joiner, current.strip()))
+            current, joiner = "", "\n\n"
+        elif current.strip():
+            current = current.rstrip() + "\n\n"
+    if current.strip():
+        chunks.append((joiner, current.strip()))
+    return chunks
+
+
+def _cut_long_sentence(sentence, max_chars, used=0):
+    """
+    Cut a sentence longer than max_chars into pieces that end after the last
+    whitespace that fits. The first piece fills the max_chars - used left in
+    the current chunk; text without whitespace is cut anywhere.
+    """
+    if len(sentence) <= max_chars:
+        return [sentence]
+    pieces, room = [], max_chars - used
+    while len(sentence) > room:
+        cut = 0
+        for match in WHITESPACE.finditer(sentence, 1, room):
+            cut = match.end()
+        if not cut and room == max_chars:
+            cut = max_chars
+        if cut:
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:]
+        room = max_chars
+    pieces.append(sentence)
+    return pieces
+
+
+def chunk_context(chunk, max_chars):
+    """The end of a chunk, trimmed to start at a sentence, to give the next chunk context."""
+    if len(chunk) <= max_chars:
+        return chunk
+    tail = chunk[-max_chars:]
+    match = SENTENCE_BOUNDARY.search(tail)
+    return tail[match.end():] if match and match.end() < len(tail) else tail
+
+
+# ---------------------------------------------------------------------
+# FORMAT JOBS
+# ---------------------------------------------------------------------
+class FormatJob:
+    """One formatting request running on the format executor."""
+
+    def __init__(self, text, format_type, source_seq=None):
+        self.text = text  # Text sent for formatting
+        self.format_type = format_type
+        self.source_seq = source_seq  # Last cache segment the text covers, if from the cache
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop streaming and discard the result once it arrives."""
+        # The future is left to run so the job clears its own in-flight state
+        self._cancelled.set()
+
+
+class StylePreview:
+    """One text formatted in every style at once, for picking the result to paste."""
+
+    def __init__(self, text, styles, source_seq=None):
+        self.text = text
+        self.styles = styles  # Display order; pick hotkeys number them from 1
+        self.source_seq = source_seq  # Last cache segment the text covers, if from the cache
+        self.results = {}  # style -> formatted text, filled in as results arrive
+        self._cancelled = threading.Event()
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+
 # ---------------------------------------------------------------------
 # TEXT CACHE (CORE LOGIC)
 # ---------------------------------------------------------------------
 class TextCache:
-    def __init__(self, config):
-        self.cache = ""  # Current text in memory
+    def __init__(self, config, notification_class=None):
+        self.buffer = SegmentBuffer()  # Current text in memory
         self.previous_raw = ""  # Last raw text that was pasted
-        self.last_unformatted_text = ""
-        self.last_formatted_text = ""
-        self.last_format_used = None
+        self.last_ttft = None  # Time to first token of the last streamed format
         self.config = config
 
         self.is_pasting = False
         self.is_formatting = False
         self.lock = threading.Lock()
+        self.paste_lock = threading.Lock()  # Serializes clipboard + keystroke sequences
+
+        self.current_job = None
+        self.format_executor = ThreadPoolExecutor(
+            max_workers=self.config["formatting"].get("workers", 2),
+            thread_name_prefix="format",
+        )
+        # "Preview all" formats every style at once
+        self.current_preview = None
+        self.preview_change_callback = None  # Called with the open preview, or None once it closes
+        self.preview_styles = [s for s in self.config["formatting_prompts"] if s != "None"]
+        self.preview_executor = ThreadPoolExecutor(
+            max_workers=max(len(self.preview_styles), 1), thread_name_prefix="preview"
+        )
+        # Parts of long transcripts are formatted concurrently on their own bounded pool
+        self.chunk_executor = ThreadPoolExecutor(
+            max_workers=self.config["formatting"].get("chunk_workers", 4),
+            thread_name_prefix="format-chunk",
+        )
 
-        self.notification = EnhancedNotification(
+        # Benchmarks pass a headless stand-in; the app always uses the Tk window
+        if notification_class is None:
+            from .gui_notification import EnhancedNotification as notification_class
+        self.notification = notification_class(
             format_callback=self.format_and_paste, config=config
         )
         self.notification.set_raw_paste_callback(self.paste_and_clear)
+        self.notification.set_preview_callback(self.preview_all_styles)
+        self.notification.set_preview_paste_callback(self.paste_preview)
 
         self.api_key = self.config["api"]["gemini_api_key"] or os.environ.get(
             "GEMINI_API_KEY", ""
         )
 
+        self.format_cache = FormatCache.from_config(self.config)
+        self.local_formatter = LocalFormatter.from_config(self.config)
+        self.paste_engine = PasteEngine.from_config(self.config)
+        self.speculator = SpeculativeFormatter.from_config(self, self.config)
+        self.notification.set_format_change_callback(self._on_format_changed)
+
+        # One pooled client for the app lifetime so formats reuse warm connections
+        self.gemini = GeminiClient.from_config(self.config, self.api_key)
+        if self.api_key:
+            self.gemini.warm_up(self.config["api"]["model"])
+
     def add_text(self, text):
         """Add recognized speech to the text cache."""
         # Skip if recording is disabled
@@ -41,12 +211,23 @@ class TextCache:
             return
 
         with self.lock:
-            self.cache += text + " "
+            self.buffer.append(text)
+            metrics.finish("speech_end", "speech_end_to_add_text")
             print(f"[TextCache] Added to cache: '{text}'")
             play_sound("text_added")
-            self.notification.show_content(self.cache)
+            # The window only shows the tail (one extra char tells it to add "..."),
+            # so don't join the whole session on every utterance
+            self.notification.show_content(self.buffer.tail(DISPLAY_CHARS + 1))
             self._update_status()
 
+        if self.speculator is not None:
+            self.speculator.schedule()
+
+    def show_partial(self, text):
+        """Show a live, uncommitted transcription hypothesis (not added to the cache)."""
+        if self.notification.is_recording_enabled():
+            self.notification.show_partial(text)
+
     def paste_and_clear(self):
         """
         Paste the current cache, then clear.
@@ -56,8 +237,10 @@ class TextCache:
             f"[TextCache] Hotkey triggered: {self.config['hotkeys']['paste_raw']} (raw paste)"
         )
         with self.lock:
+            metrics.finish("hotkey_paste_raw", "hotkey_to_paste_raw")
+            has_new_text = bool(self.buffer)
             text_to_paste = (
-                self.cache.strip() if self.cache.strip() else self.previous_raw
+                self.buffer.text().strip() if has_new_text else self.previous_raw
             )
 
             if not text_to_paste:
@@ -71,11 +254,13 @@ class TextCache:
                 self._update_status()
 
                 # If new text is in the cache, update previous_raw
-                if self.cache.strip():
+                if has_new_text:
                     self.previous_raw = text_to_paste
-                    self.notification.message_queue.put(("add_history", text_to_paste))
+                    self.notification.post("add_history", text_to_paste)
 
-                self.cache = ""  # Clear it now that we have "finished" that chunk.
+                self.buffer.clear()  # Clear it now that we have "finished" that chunk.
+                if self.speculator is not None:
+                    self.speculator.invalidate()
 
                 # Actually paste
                 self._perform_paste_operation(text_to_paste)
@@ -91,13 +276,20 @@ class TextCache:
     def format_and_paste(self, text=None, format_type=None):
         """
         Format the text using Gemini (if needed) and then paste.
+
+        The lock is only held to snapshot the text; the request itself runs as a
+        FormatJob on the format executor so transcription and raw paste keep
+        working while it is in flight. Returns the job, or None if nothing was
+        submitted.
         """
         print(
             f"[TextCache] Hotkey triggered: {self.config['hotkeys']['paste_formatted']} (format & paste)"
         )
         with self.lock:
+            metrics.finish("hotkey_paste_formatted", "hotkey_to_format")
             # If no text provided, we use what's in the cache:
-            text_to_format = text.strip() if text else self.cache.strip()
+            from_cache = not text and bool(self.buffer)
+            text_to_format = self.buffer.text().strip() if from_cache else (text or "").strip()
 
             # If still nothing, fallback to previous_raw
             if not text_to_format:
@@ -107,113 +299,412 @@ class TextCache:
                 print("[TextCache] Nothing to format (empty cache + no previous raw).")
                 play_sound("error")
                 self.notification.update_status("Nothing to format - cache is empty")
-                return
+                return None
 
             # If no format_type, get from GUI
             if not format_type:
                 format_type = self.notification.get_current_format()
 
-            # If user says "None", just raw paste
-            if format_type == "None":
-                # If we have new text in cache, do a normal paste_and_clear
-                if text == self.cache:
-                    self.paste_and_clear()
-                else:
-                    self._paste_direct(text_to_format, is_formatted=False)
+            if format_type != "None":
+                # If we are formatting new text from the cache, set previous_raw
+                if from_cache:
+                    self.previous_raw = text_to_format
+                    self.notification.post("add_history", text_to_format)
+
+                job = FormatJob(
+                    text_to_format, format_type, self.buffer.last_seq if from_cache else None
+                )
+                superseded = self.current_job
+                self.current_job = job
+                self.is_formatting = True
+
+        # If user says "None", just raw paste
+        if format_type == "None":
+            # If we have new text in cache, do a normal paste_and_clear
+            if from_cache:
+                self.paste_and_clear()
+            else:
+                self._paste_direct(text_to_format, is_formatted=False)
+            return None
+
+        # A newer request replaces whatever was still formatting
+        if superseded is not None:
+            superseded.cancel()
+
+        job.future = self.format_executor.submit(self._run_format_job, job)
+        return job
+
+    def cancel_format(self):
+        """Cancel the in-flight formatting job and close the style preview, if any."""
+        with self.lock:
+            job = self.current_job
+            preview, self.current_preview = self.current_preview, None
+        if preview is not None:
+            preview.cancel()
+            self.notification.post("preview_close", None)
+            self._preview_changed(None)
+        if job is None:
+            if preview is None:
+                self.notification.update_status("Nothing to cancel")
+                return False
+            self.notification.update_status("Preview closed")
+            return True
+
+        job.cancel()
+        print(f"[TextCache] Cancelled {job.format_type} formatting")
+        play_sound("error")
+        self.notification.update_status("Formatting cancelled")
+        return True
+
+    def preview_all_styles(self):
+        """
+        Format the cache (or the last raw text) in every style concurrently. Results
+        fill the preview panel as they arrive and go into the format cache; nothing
+        is pasted until paste_preview() picks one. Returns the StylePreview.
+        """
+        with self.lock:
+            from_cache = bool(self.buffer)
+            text = self.buffer.text().strip() if from_cache else self.previous_raw
+            source_seq = self.buffer.last_seq if from_cache else None
+            if not text:
+                play_sound("error")
+                self.notification.update_status("Nothing to preview - cache is empty")
+                return None
+            preview = StylePreview(text, list(self.preview_styles), source_seq)
+            superseded, self.current_preview = self.current_preview, preview
+
+        if superseded is not None:
+            superseded.cancel()
+        print(f"[TextCache] Previewing {len(text)} chars in {len(preview.styles)} styles")
+        play_sound("processing")
+        self.notification.post("preview_start", preview.styles)
+        self._preview_changed(preview)
+        self.notification.update_status(f"Previewing {len(preview.styles)} styles...")
+        for style in preview.styles:
+            self.preview_executor.submit(self._run_preview_style, preview, style)
+        return preview
+
+    def set_preview_change_callback(self, callback):
+        """Set callback for a style preview opening (with the preview) or closing (with None)."""
+        self.preview_change_callback = callback
+
+    def _preview_changed(self, preview):
+        if self.preview_change_callback is not None:
+            try:
+                self.preview_change_callback(preview)
+            except Exception as e:
+                print(f"[TextCache] Preview change callback failed: {e}")
+
+    def _run_preview_style(self, preview, style):
+        """Format the preview text in one style and publish the result."""
+        try:
+            if preview.is_cancelled:
                 return
+            if self.formatting_backend(style) == LOCAL_BACKEND:
+                result = self.local_formatter.format(preview.text)
+            elif not self.api_key:
+                raise ValueError("Gemini API key not set")
+            else:
+                result = self.format_cache.get_or_compute(
+                    self.format_cache_key(preview.text, style),
+                    lambda: self.format_text(preview.text, style),
+                )
+        except Exception as e:
+            print(f"[TextCache] Preview in {style} failed: {e}")
+            result = None
 
-            # Process formatting request
-            self._handle_formatting(text, text_to_format, format_type)
+        if preview.is_cancelled:
+            return
+        if result is not None:
+            preview.results[style] = result
+        self.notification.post("preview_result", (style, result))
 
-    def _handle_formatting(self, original_text, text_to_format, format_type):
-        """Handle the formatting part of format_and_paste."""
-        self.is_formatting = True
+    def paste_preview(self, choice, before_paste=None):
+        """
+        Paste a preview result, chosen by style name or by 1-based position.
+        before_paste runs only if something is about to be pasted.
+        """
+        with self.lock:
+            preview = self.current_preview
+            if preview is None:
+                return False
+            if isinstance(choice, int):
+                if not 1 <= choice <= len(preview.styles):
+                    return False
+                choice = preview.styles[choice - 1]
+            result = preview.results.get(choice)
+            if result is None:
+                self.notification.update_status(f"{choice} preview is not ready")
+                return False
+
+            self.current_preview = None
+            # Picking a result consumes the text it was made from, like Format & Paste
+            if preview.source_seq is not None:
+                self.previous_raw = preview.text
+                self.notification.post("add_history", preview.text)
+                self.buffer.drop_through(preview.source_seq)
+                if self.speculator is not None:
+                    self.speculator.invalidate()
+
+        preview.cancel()
+        print(f"[TextCache] Pasting {choice} preview")
+        self.notification.post("preview_close", None)
+        self._preview_changed(None)
+        self.notification.show_format_result(result)
+        if before_paste is not None:
+            before_paste()
+        self._paste_direct(result, is_formatted=True)
+        self._update_status()
+        return True
+
+    def _run_format_job(self, job):
+        """Run one formatting job on the executor and commit its result."""
         try:
+            if job.is_cancelled:
+                return
+
             play_sound("processing")
             self._update_status()
-            self.notification.update_status(f"Formatting with {format_type}...")
+            self.notification.update_status(f"Formatting with {job.format_type}...")
+
+            if self.formatting_backend(job.format_type) == LOCAL_BACKEND:
+                # In-process and fast: no cache, no network, no API key needed
+                self._commit_format_job(job, self.local_formatter.format(job.text), False)
+                return
 
-            # If we are formatting new text from the cache, set previous_raw
-            if original_text == self.cache and self.cache.strip():
-                self.previous_raw = text_to_format
-                self.notification.message_queue.put(("add_history", text_to_format))
+            # Reuse a cached result, or share an identical request already in flight
+            cache_key = self.format_cache_key(job.text, job.format_type)
+            outcome = {"called_api": False, "already_pasted": False}
 
-            # Check if we can reuse a previous format
-            same_unformatted = text_to_format == self.last_unformatted_text
-            same_format = format_type == self.last_format_used
+            def compute():
+                outcome["called_api"] = True
+                formatted, outcome["already_pasted"] = self._format_with_api(job)
+                return formatted
 
-            if same_unformatted and same_format and self.last_formatted_text:
+            formatted_text = self.format_cache.get_or_compute(cache_key, compute)
+            if not outcome["called_api"] and formatted_text is not None:
                 print(
                     "[TextCache] Reusing previously formatted text (no new LLM call)."
                 )
-                formatted_text = self.last_formatted_text
-                self.notification.show_format_result(formatted_text)
-                self._paste_direct(formatted_text, is_formatted=True)
-            else:
-                self._format_with_api(text_to_format, format_type, original_text)
 
+            if formatted_text is not None:
+                self._commit_format_job(job, formatted_text, outcome["already_pasted"])
+
+        except DeadlineExceeded:
+            error_msg = (
+                f"{job.format_type} formatting timed out after {self.format_deadline(job.format_type)} s"
+            )
+            print("[TextCache]", error_msg)
+            self.notification.update_status(error_msg)
+            play_sound("error")
         except Exception as e:
             error_msg = f"Error during formatting: {str(e)}"
             print("[TextCache]", error_msg)
             self.notification.update_status(error_msg)
             play_sound("error")
         finally:
-            self.is_formatting = False
+            with self.lock:
+                if self.current_job is job:
+                    self.current_job = None
+                    self.is_formatting = False
             self._update_status()
 
-    def _format_with_api(self, text_to_format, format_type, original_text):
-        """Format text using the Gemini API."""
+    def _commit_format_job(self, job, formatted_text, already_pasted):
+        """Atomically record a finished job's result, then show and paste it."""
+        with self.lock:
+            if job.is_cancelled:
+                print(f"[TextCache] Discarding result of cancelled {job.format_type} job")
+                return
+
+            # The formatted chunk is done; keep anything dictated while it was in flight
+            if job.source_seq is not None:
+                self.buffer.drop_through(job.source_seq)
+                if self.speculator is not None:
+                    self.speculator.invalidate()
+
+        self.notification.show_format_result(formatted_text)
+        if already_pasted:
+            play_sound("paste_formatted")
+        else:
+            self._paste_direct(formatted_text, is_formatted=True)
+
+    def _format_with_api(self, job):
+        """
+        Format text using the Gemini API.
+        Returns (formatted_text, already_pasted), or (None, False) if nothing was produced.
+        """
         if not self.api_key:
             error_msg = (
                 "Gemini API key not set! Provide it in config.toml or environment."
             )
             print("[TextCache]", error_msg)
             self.notification.update_status(error_msg)
-            return
+            return None, False
 
-        prompt = self.config["formatting_prompts"][format_type] + text_to_format
+        prompt = self.config["formatting_prompts"][job.format_type] + job.text
         print(f"[TextCache] Formatting with prompt: '{prompt[:70]}...'")
 
-        formatted_text = generate_gemini(
-            prompt, self.api_key, self.config["api"]["model"]
-        )
+        model = self.config["api"]["model"]
+        formatting = self.config["formatting"]
+        already_pasted = False
+        if self._needs_chunking(job.text):
+            formatted_text = self._format_chunked(job.text, job.format_type, job)
+        elif formatting.get("streaming", False):
+            progressive = formatting.get("progressive_paste", False)
+            formatted_text = self._stream_format(prompt, model, progressive, job)
+            already_pasted = progressive
+        else:
+            formatted_text = self.format_text(job.text, job.format_type)
+
+        if job.is_cancelled:
+            return None, False
 
         print(
             f"[TextCache] Formatted text (first 50 chars): '{formatted_text[:50]}...'"
         )
+        return formatted_text, already_pasted
+
+    def format_text(self, text, format_type):
+        """Format text with the style's backend and return it, without showing or pasting it."""
+        if self.formatting_backend(format_type) == LOCAL_BACKEND:
+            return self.local_formatter.format(text)
+        if self._needs_chunking(text):
+            return self._format_chunked(text, format_type)
+        prompt = self.config["formatting_prompts"][format_type] + text
+        return self.gemini.generate(
+            prompt, self.config["api"]["model"], deadline=self.format_deadline(format_type)
+        )
 
-        self.last_unformatted_text = text_to_format
-        self.last_format_used = format_type
-        self.last_formatted_text = formatted_text
-
-        # If we formatted the actual cache text, we consider that chunk done
-        if original_text == self.cache:
-            self.cache = ""
+    def _needs_chunking(self, text):
+        threshold = self.config["formatting"].get("chunk_threshold", 0)
+        return bool(threshold) and len(text) > threshold
 
-        self.notification.show_format_result(formatted_text)
-        self._paste_direct(formatted_text, is_formatted=True)
+    def _format_chunked(self, text, format_type, job=None):
+        """
+        Format a long text as sentence/paragraph-aligned chunks in parallel and
+        reassemble them in order. Each chunk after the first sees the end of the
+        previous one as context. With a job, finished prefixes are shown as they
+        complete and cancelling the job stops chunks that haven't started.
+        """
+        formatting = self.config["formatting"]
+        chunks = split_into_chunks(text, formatting.get("chunk_size", 2000))
+        overlap = formatting.get("chunk_overlap", 200)
+        model = self.config["api"]["model"]
+        style_prompt = self.config["formatting_prompts"][format_type]
+        deadline = self.format_deadline(format_type)
+        deadline_at = None if deadline is None else time.monotonic() + deadline
+        print(f"[TextCache] Formatting {len(text)} chars as {len(chunks)} chunks in parallel")
+
+        def format_chunk(prompt):
+            if job is not None and job.is_cancelled:
+                return ""
+            remaining = None if deadline_at is None else max(deadline_at - time.monotonic(), 0.001)
+            return self.gemini.generate(prompt, model, deadline=remaining).strip()
+
+        futures = []
+        for index, (joiner, chunk) in enumerate(chunks):
+            prompt = style_prompt + chunk
+            if index and overlap:
+                context = chunk_context(chunks[index - 1][1], overlap)
+                prompt = CHUNK_CONTEXT_PROMPT.format(
+                    index=index + 1, total=len(chunks), context=context
+                ) + prompt
+            futures.append(self.chunk_executor.submit(format_chunk, prompt))
+
+        formatted = ""
+        try:
+            # Collected in order, so the window always shows a correct prefix
+            for index, future in enumerate(futures):
+                formatted += chunks[index][0] + future.result()
+                if job is not None:
+                    if job.is_cancelled:
+                        return None
+                    self.notification.show_format_result(formatted, partial=True)
+                    self.notification.update_status(f"Formatted {index + 1}/{len(chunks)} chunks")
+        finally:
+            for future in futures:
+                future.cancel()
+        return formatted
+
+    def format_deadline(self, format_type):
+        """Seconds a style may take from [deadlines] (its own entry or "default"); None = no limit."""
+        deadlines = self.config.get("deadlines", {})
+        return deadlines.get(format_type, deadlines.get("default")) or None
+
+    def formatting_backend(self, format_type):
+        """Backend ("gemini" or "local") that [formatting_backends] assigns to a style."""
+        backend = self.config.get("formatting_backends", {}).get(format_type, GEMINI_BACKEND)
+        if backend not in (GEMINI_BACKEND, LOCAL_BACKEND):
+            print(f"[TextCache] Unknown backend '{backend}' for {format_type}, using Gemini")
+            return GEMINI_BACKEND
+        return backend
+
+    def format_cache_key(self, text, format_type):
+        """Format cache key for text in the given style with the configured model."""
+        return self.format_cache.make_key(
+            text,
+            format_type,
+            self.config["api"]["model"],
+            self.config["formatting_prompts"][format_type],
+        )
 
-        prompt = self.config["formatting_prompts"][format_type] + text_to_format
-        print(f"[TextCache] Formatting with prompt: '{prompt[:70]}...'")
+    def speculation_snapshot(self):
+        """Return (text, format_type) a speculative pre-format should work on."""
+        if not self.api_key:
+            return "", None
+        with self.lock:
+            if self.is_formatting:
+                return "", None
+            text = self.buffer.text().strip()
+        format_type = self.notification.get_current_format()
+        # Local styles format instantly at paste time; nothing to speculate on
+        if self.formatting_backend(format_type) == LOCAL_BACKEND:
+            return "", None
+        return text, format_type
+
+    def _on_format_changed(self, format_type):
+        """GUI style selection changed: speculate again for the new style."""
+        if self.speculator is not None:
+            # Runs on the Tk thread, which must never wait on self.lock: its holders post to the GUI.
+            # A stale answer only costs one debounce period.
+            if self.buffer:
+                self.speculator.schedule()
+            else:
+                self.speculator.invalidate()
 
-        formatted_text = generate_gemini(
-            prompt, self.api_key, self.config["api"]["model"]
-        )
+    def _stream_format(self, prompt, model, progressive_paste, job):
+        """
+        Stream the formatted text, showing partial output as it arrives.
+        With progressive_paste, complete sentences are pasted as soon as they finish.
+        Stops reading (and closes the response) as soon as the job is cancelled.
+        """
+        start = time.perf_counter()
+        chunks = []
+        pending = ""  # Streamed text not pasted yet
+
+        deadline = self.format_deadline(job.format_type)
+        for chunk in self.gemini.stream_generate(prompt, model, deadline=deadline):
+            if job.is_cancelled:
+                break
+
+            if not chunks:
+                self.last_ttft = time.perf_counter() - start
+                print(f"[TextCache] First token after {self.last_ttft * 1000:.0f} ms")
+                self._update_status()
 
-        print(
-            f"[TextCache] Formatted text (first 50 chars): '{formatted_text[:50]}...'"
-        )
+            chunks.append(chunk)
+            self.notification.show_format_result("".join(chunks), partial=True)
 
-        self.last_unformatted_text = text_to_format
-        self.last_format_used = format_type
-        self.last_formatted_text = formatted_text
+            if progressive_paste:
+                pending += chunk
+                ready, pending = split_complete_sentences(pending)
+                if ready:
+                    self._perform_paste_operation(ready)
 
-        # If we formatted the actual cache text, we consider that chunk done
-        if original_text == self.cache:
-            self.cache = ""
+        if progressive_paste and pending and not job.is_cancelled:
+            self._perform_paste_operation(pending)
 
-        self.notification.show_format_result(formatted_text)
-        self._paste_direct(formatted_text, is_formatted=True)
+        return "".join(chunks)
 
     def _paste_direct(self, text, is_formatted):
         """
@@ -243,26 +734,13 @@ class TextCache:
 
 
     def _perform_paste_operation(self, text):
-        try:
-            original_clipboard = pyperclip.paste()
-            pyperclip.copy(text)
-
-            # Tweak this sleep to something smaller – or remove it entirely
-            # if you find that your system doesn't need the delay.
-            time.sleep(0.05)  
-
-            # Option A: Use keyboard lib
-            import keyboard
-            keyboard.press_and_release('ctrl+v')
-
-            # Option B: Or use pyautogui.hotkey which handles press + release:
-            # pyautogui.hotkey('ctrl', 'v')
-
-            # If you can safely remove or reduce the second sleep, do so:
-            time.sleep(0.03)
-
-            pyperclip.copy(original_clipboard)
+        with self.paste_lock:
+            self._paste_via_clipboard(text)
 
+    def _paste_via_clipboard(self, text):
+        try:
+            # Waits for the clipboard to confirm the copy instead of a fixed sleep
+            self.paste_engine.paste(text)
         except Exception as e:
             print(f"Paste operation error: {e}")
             self.notification.update_status(f"Paste error: {e}")
@@ -271,8 +749,8 @@ class TextCache:
     def _update_status(self):
         """Update status bar with current state information."""
         status_parts = []
-        if self.cache.strip():
-            words = len(self.cache.strip().split())
+        if self.buffer:
+            words = self.buffer.word_count
             status_parts.append(f"Cache: {words} words")
         else:
             status_parts.append("Cache: Empty")
@@ -285,9 +763,26 @@ class TextCache:
         format_type = self.notification.get_current_format()
         status_parts.append(f"Format: {format_type}")
 
+        if self.last_ttft is not None:
+            status_parts.append(f"TTFT: {self.last_ttft * 1000:.0f} ms")
+
         final_status = " | ".join(status_parts)
         self.notification.update_status(final_status)
 
     def cleanup(self):
         """Clean up resources before exit."""
+        if self.speculator is not None:
+            self.speculator.close()
+        if self.current_job is not None:
+            self.current_job.cancel()
+        self.format_executor.shutdown(wait=False)
+        self.chunk_executor.shutdown(wait=False)
+        if self.current_preview is not None:
+            self.current_preview.cancel()
+        self.preview_executor.shutdown(wait=False)
+        self.gemini.close()
+        print(f"[TextCache] Format cache stats: {self.format_cache.stats()}")
+        self.format_cache.close()
+        print(f"[TextCache] Paste timing stats: {self.paste_engine.stats()}")
+        self.paste_engine.close()
         self.notification.cleanup()
@@ -0,0 +1,358 @@
+"""
+X11 clipboard access over the X protocol itself (python-xlib), without
+running xclip for every read and write.
+
+SelectionOwner serves clipboard contents in every format they were
+captured in (xclip can only offer one target at a time), using the INCR
+protocol for data too large for a single request. ClipboardConnection
+keeps one connection open for the life of the app and both reads and owns
+the clipboard through it.
+
+    python -m speak_now.x11_selection < snapshot
+
+reads a snapshot written by clipboard.write_formats() from stdin, prints "owned" once
+the clipboard is taken and serves it until another program takes it, like
+xclip does. The app uses this to keep its clipboard contents alive after
+it exits.
+"""
+import os
+import queue
+import select
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from Xlib import X, Xatom, display
+from Xlib.protocol import event
+
+from .clipboard import read_formats
+
+
+# Largest property written in one request; larger data goes through INCR
+MAX_CHUNK = 256 * 1024
+# Longest wait for the connection thread to answer a call
+CALL_TIMEOUT = 5.0
+
+
+def text_formats(text):
+    """Every target plain text is commonly asked for under."""
+    utf8 = text.encode("utf-8")
+    latin1 = text.encode("latin-1", errors="replace")
+    return {
+        "UTF8_STRING": utf8,
+        "text/plain;charset=utf-8": utf8,
+        "TEXT": utf8,
+        "STRING": latin1,
+        "text/plain": latin1,
+    }
+
+
+# ---------------------------------------------------------------------
+# SELECTION OWNER
+# ---------------------------------------------------------------------
+class SelectionOwner:
+    """Owns an X11 selection and serves {target name: bytes} to whoever asks."""
+
+    def __init__(self, formats=None, selection="CLIPBOARD"):
+        self.display = display.Display()
+        self.window = self.display.screen().root.create_window(
+            0, 0, 1, 1, 0, X.CopyFromParent, event_mask=X.PropertyChangeMask
+        )
+        self.selection = self.display.intern_atom(selection)
+        self.targets_atom = self.display.intern_atom("TARGETS")
+        self.incr_atom = self.display.intern_atom("INCR")
+        # Leave room for the request header; max_request_length is in 4-byte units
+        self.chunk_size = min(MAX_CHUNK, self.display.info.max_request_length * 4 - 64)
+        self.transfers = {}  # (requestor id, property) -> [requestor, target, data, offset]
+        self.owns = False
+        self.names = {}  # target atom -> name, for the formats being served
+        self.formats = {}  # target atom -> bytes
+        if formats:
+            self.set_formats(formats)
+
+    def set_formats(self, formats):
+        self.names = {self.display.intern_atom(target): target for target in formats}
+        self.formats = {self.display.intern_atom(target): data for target, data in formats.items()}
+
+    def own(self):
+        """Take the selection; False if the X server didn't give it to us."""
+        self.window.set_selection_owner(self.selection, X.CurrentTime)
+        self.display.flush()
+        self.owns = self.display.get_selection_owner(self.selection) == self.window
+        return self.owns
+
+    def owned_formats(self):
+        """{target name: bytes} being served, or None if another client owns the selection."""
+        if not self.owns:
+            return None
+        return {self.names[atom]: data for atom, data in self.formats.items()}
+
+    def serve(self):
+        """Answer requests until another client owns the selection and transfers are done."""
+        while self.owns or self.transfers:
+            self.handle(self.display.next_event())
+        self.display.close()
+
+    def handle(self, e):
+        if e.type == X.SelectionRequest:
+            self._answer(e)
+        elif e.type == X.SelectionClear and e.atom == self.selection:
+            self.owns = False
+        elif e.type == X.PropertyNotify and e.state == X.PropertyDelete:
+            self._continue_transfer(e)
+
+    def _answer(self, e):
+        requestor = e.requestor
+        # Obsolete clients leave the property unset and expect the target name
+        prop = e.property if e.property != X.NONE else e.target
+        if not self.owns:
+            prop = X.NONE
+        elif e.target == self.targets_atom:
+            requestor.change_property(prop, Xatom.ATOM, 32, [self.targets_atom, *self.formats])
+        elif e.target in self.formats:
+            data = self.formats[e.target]
+            if len(data) > self.chunk_size:
+                # Announce the size, then send a chunk each time the requestor deletes the property
+                requestor.change_attributes(event_mask=X.PropertyChangeMask)
+                requestor.change_property(prop, self.incr_atom, 32, [len(data)])
+                self.transfers[(requestor.id, prop)] = [requestor, e.target, data, 0]
+            else:
+                requestor.change_property(prop, e.target, 8, data)
+        else:
+            prop = X.NONE  # Refuse
+
+        notify = event.SelectionNotify(
+            time=e.time,
+            requestor=requestor,
+            selection=e.selection,
+            target=e.target,
+            property=prop,
+        )
+        requestor.send_event(notify)
+        self.display.flush()
+
+    def _continue_transfer(self, e):
+        transfer = self.transfers.get((e.window.id, e.atom))
+        if transfer is None:
+            return
+        requestor, target, data, offset = transfer
+        chunk = data[offset:offset + self.chunk_size]
+        # The zero-length chunk after the last one ends the transfer
+        requestor.change_property(e.atom, target, 8, chunk)
+        if chunk:
+            transfer[3] = offset + len(chunk)
+        else:
+            del self.transfers[(e.window.id, e.atom)]
+        self.display.flush()
+
+
+# ---------------------------------------------------------------------
+# PERSISTENT CONNECTION
+# ---------------------------------------------------------------------
+class ClipboardConnection:
+    """
+    One long-lived X11 connection that reads and owns the clipboard. A
+    single thread handles all X events, so contents we own keep being
+    served while other threads read or write; read() and write() hand their
+    work to that thread and wait for the answer.
+    """
+
+    def __init__(self, selection="CLIPBOARD", timeout=1.0):
+        self.owner = SelectionOwner(selection=selection)
+        self.display = self.owner.display
+        self.window = self.owner.window
+        self.timeout = timeout  # Longest wait for another program to answer a read
+        self._property = self.display.intern_atom("SPEAK_NOW_SELECTION")
+
+        self._requests = queue.Queue()
+        self._wake_read, self._wake_write = os.pipe()
+        self._closed = False
+        self._error = None  # Why the connection thread stopped, if it did on its own
+        self._alive_lock = threading.Lock()  # Held to hand work to the thread and while it shuts down
+        self._alive = True
+        self._thread = threading.Thread(target=self._run, name="x11-clipboard", daemon=True)
+        self._thread.start()
+
+    def read(self, target):
+        """Clipboard contents as `target` (e.g. "UTF8_STRING", "image/png"), or None."""
+        return self._call(self._read, target)
+
+    def targets(self):
+        """Names of the targets the clipboard is offered as."""
+        return self._call(self._targets)
+
+    def write(self, formats):
+        """Own the clipboard with {target: bytes}; False if the X server refused."""
+        return self._call(self._write, formats)
+
+    def close(self):
+        """Close the connection; returns what we still owned so it can be handed off."""
+        try:
+            formats = self._call(self.owner.owned_formats)
+        except RuntimeError:
+            return None
+        with self._alive_lock:
+            self._closed = True
+            if self._alive:
+                os.write(self._wake_write, b"\0")
+        self._thread.join(timeout=2)
+        return formats
+
+    def _call(self, function, *args):
+        future = Future()
+        with self._alive_lock:
+            if not self._alive:
+                raise self._closed_error()
+            self._requests.put((function, args, future))
+            os.write(self._wake_write, b"\0")
+        try:
+            return future.result(timeout=CALL_TIMEOUT)
+        except TimeoutError:
+            raise RuntimeError("X11 clipboard connection stopped responding") from None
+
+    def _closed_error(self):
+        if self._error is None:
+            return RuntimeError("X11 clipboard connection is closed")
+        return RuntimeError(f"X11 clipboard connection was lost: {self._error}")
+
+    # Everything below runs on the connection thread
+
+    def _run(self):
+        try:
+            while not self._closed:
+                while self.display.pending_events():
+                    self.owner.handle(self.display.next_event())
+                readable, _, _ = select.select([self.display, self._wake_read], [], [])
+                if self._wake_read in readable:
+                    os.read(self._wake_read, 512)
+                    self._run_requests()
+        except Exception as e:
+            self._error = e
+            print(f"[Clipboard] X11 connection lost: {e}")
+        finally:
+            # No call may queue work or touch the pipe once it is closed
+            with self._alive_lock:
+                self._alive = False
+                os.close(self._wake_read)
+                os.close(self._wake_write)
+            self._fail_requests()
+            try:
+                self.display.close()
+            except Exception:
+                pass  # The connection may be what broke
+
+    def _run_requests(self):
+        while True:
+            try:
+                function, args, future = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _fail_requests(self):
+        while True:
+            try:
+                _, _, future = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            future.set_exception(self._closed_error())
+
+    def _next_event(self, deadline):
+        """Next X event, or None once `deadline` (time.monotonic()) has passed."""
+        while not self.display.pending_events():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            select.select([self.display], [], [], remaining)
+        return self.display.next_event()
+
+    def _targets(self):
+        formats = self.owner.owned_formats()
+        if formats is not None:
+            return list(formats)
+        prop = self._convert(self.owner.targets_atom)
+        if prop is None or prop.format != 32:
+            return []
+        return [self.display.get_atom_name(atom) for atom in prop.value]
+
+    def _read(self, target):
+        formats = self.owner.owned_formats()
+        if formats is not None:
+            # Asking the X server would only route the request back to us
+            return formats.get(target)
+        prop = self._convert(self.display.intern_atom(target))
+        if prop is None or prop.format != 8:
+            return None
+        return prop.value
+
+    def _write(self, formats):
+        self.owner.set_formats(formats)
+        return self.owner.own()
+
+    def _convert(self, target):
+        """Ask the clipboard owner for `target` and collect the reply, reassembling INCR."""
+        deadline = time.monotonic() + self.timeout
+        self.window.delete_property(self._property)
+        self.window.convert_selection(self.owner.selection, target, self._property, X.CurrentTime)
+        self.display.flush()
+        while True:
+            e = self._next_event(deadline)
+            if e is None:
+                return None
+            if e.type == X.SelectionNotify and e.requestor.id == self.window.id and e.target == target:
+                break
+            self.owner.handle(e)
+        if e.property == X.NONE:
+            return None  # The owner refused the target
+
+        prop = self._take_property()
+        if prop is None or prop.property_type != self.owner.incr_atom:
+            return prop
+        # Incremental transfer: each deletion asks for the next chunk, an empty one ends it
+        chunks = []
+        while True:
+            e = self._next_event(deadline)
+            if e is None:
+                return None
+            if (e.type == X.PropertyNotify and e.window.id == self.window.id
+                    and e.atom == self._property and e.state == X.PropertyNewValue):
+                chunk = self._take_property()
+                if chunk is None or not chunk.value:
+                    break
+                chunks.append(chunk.value)
+                deadline = time.monotonic() + self.timeout
+            else:
+                self.owner.handle(e)
+        prop.format, prop.value = 8, b"".join(chunks)
+        return prop
+
+    def _take_property(self):
+        prop = self.window.get_full_property(self._property, X.AnyPropertyType)
+        self.window.delete_property(self._property)
+        self.display.flush()
+        return prop
+
+
+def main():
+    formats = read_formats(sys.stdin.buffer)
+    try:
+        owner = SelectionOwner(formats)
+        owned = owner.own()
+    except Exception as e:
+        print(f"[Clipboard] Could not connect to the X server: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not owned:
+        print("[Clipboard] Could not take the X11 clipboard", file=sys.stderr)
+        sys.exit(1)
+    # Tell the parent the clipboard is ours before it goes on to the next paste
+    sys.stdout.write("owned\n")
+    sys.stdout.close()
+    owner.serve()
+
+
+if __name__ == "__main__":
+    main()
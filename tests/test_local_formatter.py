@@ -0,0 +1,22 @@
+import pytest
+
+from speak_now.local_formatter import LocalFormatter
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Abbreviations are neither split into sentences nor followed by a capital
+        ("the U.S. economy", "The U.S. economy."),
+        ("e.g. this", "E.g. this."),
+        ("i.e. the other one", "I.e. the other one."),
+        ("apples, pears etc. and plums", "Apples, pears etc. and plums."),
+        ("ask Mr. Smith or Dr. Jones", "Ask Mr. Smith or Dr. Jones."),
+        ("meet at 5 p.m. tomorrow", "Meet at 5 p.m. tomorrow."),
+        # Ordinary sentence ends still get their space and capital
+        ("i went home.Then i slept", "I went home. Then I slept."),
+        ("hello world. how are you", "Hello world. How are you?"),
+    ],
+)
+def test_format(text, expected):
+    assert LocalFormatter().format(text) == expected
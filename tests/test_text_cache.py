@@ -0,0 +1,30 @@
+import pytest
+
+from speak_now.text_cache import split_into_chunks
+
+
+def rejoin(chunks):
+    return "".join(joiner + chunk for joiner, chunk in chunks)
+
+
+def test_split_at_sentence_ends():
+    text = " ".join(f"Sentence number {i} ends here." for i in range(200))
+    chunks = split_into_chunks(text, 500)
+    assert all(len(chunk) <= 500 for _, chunk in chunks)
+    assert all(chunk.endswith(".") for _, chunk in chunks)
+    assert rejoin(chunks) == text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "word " * 3000,  # No sentence ends: cut at whitespace
+        "x" * 4500,  # No whitespace either: cut anywhere
+        "Short one. " + "word " * 900 + "end. Next one.\n\nSecond paragraph.",
+    ],
+)
+def test_sentence_longer_than_max_chars(text):
+    chunks = split_into_chunks(text, 2000)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 2000 for _, chunk in chunks)
+    assert rejoin(chunks) == text.strip()